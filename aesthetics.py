@@ -1,9 +1,11 @@
 import time
-import curses
 import math
-import pyfiglet
+from helpers import banner
 
-def intro(stdscr):
+def intro(stdscr, scale=1.0):
+    # scale stretches or shortens every pause, like the pacing profiles do
+    # curses loads with the first scene rather than at startup
+    import curses
     curses.curs_set(0)
     stdscr.clear()
     
@@ -15,11 +17,8 @@ def intro(stdscr):
     curses.init_pair(2, curses.COLOR_GREEN, -1)
 
 
-    title_fig = pyfiglet.Figlet(font='slant')
-    title_text = title_fig.renderText("SECRETS: Fate Awaits")
-
-    subtitle_fig = pyfiglet.Figlet(font='small')
-    subtitle_text = subtitle_fig.renderText("Trust No One")
+    title_text = banner("SECRETS: Fate Awaits")
+    subtitle_text = banner("Trust No One", font='small')
 
     h, w = stdscr.getmaxyx()
     title_lines = title_text.splitlines()
@@ -30,7 +29,7 @@ def intro(stdscr):
         stdscr.addstr(start_y + i, x, line[:w])
         stdscr.attroff(curses.color_pair(1) | curses.A_BOLD)
     stdscr.refresh()
-    time.sleep(1)
+    time.sleep(scale)
 
     sub_lines = subtitle_text.splitlines()
     sub_y = start_y + len(title_lines)
@@ -40,16 +39,16 @@ def intro(stdscr):
         stdscr.addstr(sub_y + i, x, line[:w])
         stdscr.attroff(curses.color_pair(2) | curses.A_DIM)
         stdscr.refresh()
-        time.sleep(0.1)
+        time.sleep(0.1 * scale)
 
-    time.sleep(0.8)
+    time.sleep(0.8 * scale)
     
     for _ in range(3):
         for i, line in enumerate(sub_lines):
             x = max((w - len(line)) // 2, 0)
             stdscr.addstr(sub_y + i, x, ' ' * len(line))
         stdscr.refresh()
-        time.sleep(0.2)
+        time.sleep(0.2 * scale)
 
         for i, line in enumerate(sub_lines):
             x = max((w - len(line)) // 2, 0)
@@ -57,12 +56,13 @@ def intro(stdscr):
             stdscr.addstr(sub_y + i, x, line[:w])
             stdscr.attroff(curses.color_pair(2) | curses.A_BOLD)
         stdscr.refresh()
-        time.sleep(0.2)
+        time.sleep(0.2 * scale)
 
     stdscr.clear()
     stdscr.refresh()
     
 def transition(stdscr):
+    import curses
     curses.curs_set(0)
     stdscr.clear()
     if not curses.has_colors():
@@ -1,31 +1,34 @@
-import requests
+from collections import Counter
+from roles import Role, CONSPIRATOR_ROLES
+from tables import TABLES
+import functools
 import json
-from engine import Role
 import random
-from helpers import _format_beliefs, _format_history
+import re
+import threading
+import time
+from helpers import _format_history
+from llm import get_client
+from metrics import current_trace
+from scheduler import DECISION
+from prompts import PromptBuilder, PROMPT_STATS, PROMPT_TOKEN_BUDGET, estimate_tokens, fit_history, fact
 
 
-AGENT_RULES_CONTEXT = '''
+_RULES_TEMPLATE = '''
 GAME RULES & ROLE KNOWLEDGE:
-- 7 players: 4 Good (Whistleblower, Detective, Cop, President), 3 Conspirators (Don, Assassin, Infiltrator).
-- 5 missions: Rounds 1-3 & 5 require 1 fail to fail; Round 4 requires 2 fails.
+- {players} players: {good_count} Good ({good}), {bad_count} Conspirators ({bad}).
+- 5 missions: {fail_rule}
 - Leader rotates, proposes a team of size depending on round.
 - All vote Approve/Reject; 5 consecutive rejections ⇒ Conspirators win.
-- Failed mission triggers emergency vote to reveal President.
-- Good wins upon 3 successful missions; Conspirators win upon 3 failures.
+{president_rule}- Good wins upon 3 successful missions; Conspirators win upon 3 failures.
 - If Good completes 3 successful missions then Assassin may guess Whistleblower. If correct, Conspirators win.
 
 ROLE OBJECTIVES:
-- Good (Whistleblower, Detective, Cop, President): Succeed in 3 missions or avoid assassination.
-- Conspirators (Don, Assassin, Infiltrator): Fail 3 missions or assassinate the Whistleblower after 3 Good wins.
+- Good ({good}): Succeed in 3 missions or avoid assassination.
+- Conspirators ({bad}): Fail 3 missions or assassinate the Whistleblower after 3 Good wins.
 
 ROLE KNOWLEDGE:
-- Whistleblower: Knows who the Don and Assassin are.
-- Detective: Knows two candidates, one is the Whistleblower, one is the Don (but not which is which).
-- Infiltrator: Knows who the Don and Assassin are.
-- Don: Knows who the Assassin is.
-- Assassin: Knows who the Don is.
-- Cop, President: No special knowledge.
+{knowledge}
 
 IMPORTANT:
 - Never reveal or speculate about your own or anyone else's role, even indirectly.
@@ -37,135 +40,681 @@ IMPORTANT:
 - If you have nothing to add, say something neutral or supportive (e.g., "Let's give this team a try.", "I agree with the leader.", "Sounds good to me.").
 '''
 
+# What each role learns at the start (see Player.receive_initial_info); None: nothing
+_ROLE_KNOWLEDGE = {
+    Role.WHISTLEBLOWER: "Knows who the Don and Assassin are.",
+    Role.DETECTIVE: "Knows two candidates, one is the Whistleblower, one is the Don (but not which is which).",
+    Role.INFILTRATOR: "Knows who the Don and Assassin are.",
+    Role.DON: "Knows who the Assassin is.",
+    Role.ASSASSIN: "Knows who the Don is.",
+    Role.COP: None,
+    Role.PRESIDENT: None,
+}
+
+def _knowledge_text(roles):
+    # One line per seated role that learns something, then the ones that don't
+    seats = Counter(roles)
+    lines, plain = [], []
+    for role in (r for r in _ROLE_KNOWLEDGE if r in seats):
+        name = role.name.capitalize()
+        if _ROLE_KNOWLEDGE[role] is None:
+            plain.append(name)
+        elif seats[role] > 1:
+            lines.append(f"- {name} ({seats[role]} seats, who don't know each other): {_ROLE_KNOWLEDGE[role]}")
+        else:
+            lines.append(f"- {name}: {_ROLE_KNOWLEDGE[role]}")
+    if plain:
+        lines.append(f"- {', '.join(plain)}: No special knowledge.")
+    return "\n".join(lines)
+
+def _rounds_text(rounds):
+    # (1, 2, 3, 5) -> "1-3 & 5"
+    runs = []
+    for r in rounds:
+        if runs and r == runs[-1][1] + 1:
+            runs[-1][1] = r
+        else:
+            runs.append([r, r])
+    parts = [f"{a}-{b}" if a != b else f"{a}" for a, b in runs]
+    return ", ".join(parts[:-1]) + " & " + parts[-1] if len(parts) > 1 else parts[0]
+
+def rules_context(table):
+    """The shared rules block for a TableConfig."""
+    good = [r for r in table.roles if r not in CONSPIRATOR_ROLES]
+    bad = [r for r in table.roles if r in CONSPIRATOR_ROLES]
+    names = lambda roles: ", ".join(dict.fromkeys(r.name.capitalize() for r in roles))
+    doubles = table.double_fail_rounds
+    if doubles:
+        singles = [r for r in range(1, len(table.mission_sizes) + 1) if r not in doubles]
+        fail_rule = (f"Rounds {_rounds_text(singles)} require 1 fail to fail; "
+                     f"Round {_rounds_text(doubles)} requires 2 fails.")
+    else:
+        fail_rule = "Every round requires 1 fail to fail."
+    president_rule = ("- Failed mission triggers emergency vote to reveal President.\n"
+                      if Role.PRESIDENT in table.roles else "")
+    return _RULES_TEMPLATE.format(
+        players=len(table.roles), good_count=len(good), good=names(good),
+        bad_count=len(bad), bad=names(bad), fail_rule=fail_rule,
+        president_rule=president_rule, knowledge=_knowledge_text(table.roles),
+    )
+
+# The standard seven-seat table
+AGENT_RULES_CONTEXT = rules_context(TABLES[7])
+
+SANITIZE_ROLES = ["cop", "detective", "president", "don", "assassin", "infiltrator", "whistleblower"]
+SANITIZE_META_PHRASES = ["as an ai", "as a language model", "i am an ai", "i am a language model", "system", "rules", "not a valid"]
+
+def _trie_pattern(words, anchored=(), bounded=()):
+    """Regex source matching any of words, branching one character at a time.
+
+    re tries alternatives one after another at every position; sharing
+    prefixes rejects most positions after one comparison per distinct first
+    character instead of one per word. Words in anchored only match with no
+    word character before them, and words in bounded with none after; both
+    checks are lookarounds inside the word's branch, so every branch still
+    starts with a plain character for re to scan for.
+    """
+    def trie(group):
+        root = {}
+        for word in group:
+            node = root
+            for ch in word:
+                node = node.setdefault(ch, {})
+            node[''] = word
+        return root
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        end = r'(?!\w)' if node.get('') in bounded else ''
+        if not branches:
+            return end
+        if '' not in node:
+            return branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if end:
+            # Longer words first, then this one if it ends at a boundary
+            return '(?:' + '|'.join(branches + [end]) + ')'
+        return '(?:' + '|'.join(branches) + ')?'
+
+    branches = []
+    for group, guarded in (([w for w in words if w not in anchored], False), ([w for w in words if w in anchored], True)):
+        for ch, child in sorted(trie(group).items()):
+            # Checked once the first character matched: nothing word-like before it
+            lead = re.escape(ch) + (r'(?<!\w' + re.escape(ch) + ')' if guarded else '')
+            branches.append(lead + build(child))
+    return '(?:' + '|'.join(branches) + ')'
+
+class Sanitizer:
+    """Strips role reveals, invalid-name claims and AI/meta talk in one pass.
+
+    Every pattern is a literal, so they all compile into one prefix-trie
+    regex run over the lowercased text: matching is case-insensitive without
+    paying for re.IGNORECASE. Meta phrases must stand as whole words ("As an
+    AI" goes, "systematic" stays); the word boundaries are lookarounds in
+    the same regex, so each match found is final. "::" collapses to ":" in
+    the same pass.
+    """
+
+    def __init__(self, player_names):
+        # literal -> (replacement, needs a word boundary before, and after)
+        self.literals = {'::': (':', False, False)}
+        for role in SANITIZE_ROLES:
+            self.literals[f"({role})"] = ('', False, False)
+            self.literals[f"{role}: "] = ('', True, False)
+        for name in player_names:
+            for claim in ("character name", "role"):
+                self.literals[f"{name.lower()} is not a valid {claim}"] = ('', True, False)
+        for phrase in SANITIZE_META_PHRASES:
+            self.literals[phrase] = ('', True, True)
+        anchored = {w for w, (_, before, _) in self.literals.items() if before}
+        bounded = {w for w, (_, _, after) in self.literals.items() if after}
+        self.pattern = re.compile(_trie_pattern(self.literals, anchored, bounded))
+        # Longest text any one match can span
+        self.longest = max(len(w) for w in self.literals)
+        # Every start of a literal: text ending in one of these may still become a match
+        self.prefixes = frozenset(w[:i] for w in self.literals for i in range(1, len(w) + 1))
+
+    def matches(self, text, lowered, pos=0):
+        """Yield (start, end, replacement) for each match in text from pos on.
+
+        lowered is text.lower(); characters before pos still count as the
+        word boundary in front of a match.
+        """
+        literals = self.literals
+        for m in self.pattern.finditer(lowered, pos):
+            yield m.start(), m.end(), literals[m.group()][0]
+
+    def unsettled(self, lowered, pos=0):
+        """Start of the tail of lowered (from pos on) that more text could still turn into a match.
+
+        Returns len(lowered) if no tail can. A whole literal at the very end
+        counts, since the next character decides its word boundary.
+        """
+        end = len(lowered)
+        for start in range(max(pos, end - self.longest), end):
+            if lowered[start:] in self.prefixes:
+                return start
+        return end
+
+    def lower(self, text):
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            return lowered
+        # A few characters (e.g. "İ") grow when lowercased; keep those as is so positions line up
+        return "".join(ch if len(ch.lower()) != 1 else ch.lower() for ch in text)
+
+    def clean(self, text, pos=0, endpos=None):
+        """Sanitized text[pos:endpos]; text outside it is only context for matching."""
+        endpos = len(text) if endpos is None else endpos
+        literals = self.literals
+        out = []
+        last = pos
+        # matches(), inlined: this runs once per whole message
+        for m in self.pattern.finditer(self.lower(text), pos):
+            start = m.start()
+            if start >= endpos:
+                break
+            out.append(text[last:start])
+            out.append(literals[m.group()][0])
+            last = m.end()
+        if last == 0 and endpos == len(text):
+            return text
+        out.append(text[last:endpos])
+        return "".join(out)
+
+    def __call__(self, text):
+        return self.clean(text).strip()
+
+
+@functools.lru_cache(maxsize=64)
+def _sanitizer(player_names):
+    # player_names is a frozenset: the same speakers in any order share one
+    return Sanitizer(sorted(player_names))
+
 def _sanitize_agent_output(text, player_names):
-    # Remove any role reveals or meta statements
-    roles = ["cop", "detective", "president", "don", "assassin", "infiltrator", "whistleblower"]
-    for role in roles:
-        text = text.replace(f"({role})", "").replace(f"{role.capitalize()}: ", "")
-    # Remove any claims about invalid names
-    for name in player_names:
-        text = text.replace(f"{name} is not a valid character name", "")
-        text = text.replace(f"{name} is not a valid role", "")
-    # Remove meta/system/AI references
-    meta_phrases = ["as an ai", "as a language model", "i am an ai", "i am a language model", "system", "rules", "not a valid"]
-    for phrase in meta_phrases:
-        text = text.replace(phrase, "")
-    # Remove any accidental double colons or extra whitespace
-    text = text.replace("::", ":").strip()
-    return text
+    # Remove any role reveals, claims about invalid names and meta/AI talk
+    return _sanitizer(frozenset(player_names))(text)
+
+class StreamSanitizer:
+    """Sanitize text that is still being generated, chunk by chunk.
+
+    Only text that could still be the start of a pattern (a tail of the
+    buffer that is a prefix of one of the sanitizer's literals) is held back
+    until more arrives; everything before it is shown straight away. One
+    already-shown character is kept in front as lookbehind.
+    """
+
+    def __init__(self, player_names):
+        self.sanitizer = _sanitizer(frozenset(player_names))
+        # buffer[0:1] is lookbehind (already shown); the rest is unsettled
+        self.buffer = " "
+        # Whitespace is held until something follows it, so the output is stripped
+        self.spaces = ""
+        self.started = False
+
+    def _show(self, text):
+        if not self.started:
+            text = text.lstrip()
+            if not text:
+                return ""
+            self.started = True
+        body = text.rstrip()
+        if not body:
+            self.spaces += text
+            return ""
+        out = self.spaces + body
+        self.spaces = text[len(body):]
+        return out
+
+    def feed(self, chunk):
+        """Add a chunk of raw output; return the newly safe text to show."""
+        buffer = self.buffer + chunk
+        lowered = self.sanitizer.lower(buffer)
+        cut = self.sanitizer.unsettled(lowered, 1)
+        if cut <= 1:
+            self.buffer = buffer
+            return ""
+        # No match can start at or after cut and still grow, so every match
+        # starting before it is final; settle up to cut, or past the last one
+        out = []
+        last = 1
+        for start, end, replacement in self.sanitizer.matches(buffer, lowered, 1):
+            if start >= cut:
+                break
+            out.append(buffer[last:start])
+            out.append(replacement)
+            last = end
+        settled = max(cut, last)
+        out.append(buffer[last:settled])
+        self.buffer = buffer[settled - 1:]
+        return self._show("".join(out))
+
+    def flush(self):
+        """Return whatever is left once the stream has ended."""
+        out = self.sanitizer.clean(self.buffer, 1).rstrip()
+        self.buffer = self.buffer[-1:]
+        return self._show(out) if out else ""
+
+# Drop an agent's context once it grows past this many tokens, so it never
+# overflows the model's window (Ollama defaults to num_ctx=2048)
+SESSION_MAX_TOKENS = 1800
+
+def _full_prompt(player, situation, team_line, history, missions, votes, question):
+    # Rules, state and recent discussion, built under the prompt token budget
+    session = getattr(player, 'session', None)
+    if session is None:
+        return PromptBuilder(player, AGENT_RULES_CONTEXT).build(situation, team_line, history, missions, votes, question)
+    with session.lock:
+        return session.builder.build(situation, team_line, history, missions, votes, question)
+
+class AgentSession:
+    """An agent's running conversation with the model.
+
+    The first call in a round sends the rules and the agent's full state; the
+    context tokens Ollama hands back are kept, and later calls only send what
+    happened since (new discussion, votes, missions) on top of that context.
+
+    Invalidation: the context is dropped whenever the round number changes
+    (beliefs are only updated between rounds, so the primed state goes stale
+    there) and whenever it grows past SESSION_MAX_TOKENS.
+    """
+
+    def __init__(self, player, table=TABLES[7]):
+        self.player = player
+        self.rules = rules_context(table)
+        self.player_count = len(table.roles)
+        # Keeps the running vote/mission summary between full prompts
+        self.builder = PromptBuilder(player, self.rules)
+        # Re-entrant: prompt() and keep() call reset() while holding it
+        self.lock = threading.RLock()
+        self.context = None
+        self.round = None
+        # Log positions of history/missions/votes the kept context already covers
+        self.marks = (0, 0, 0)
+
+    def reset(self):
+        """Drop the kept context, so the next call sends the full prompt."""
+        with self.lock:
+            self.context = None
+            self.marks = (0, 0, 0)
+
+    def prompt(self, round_number, situation, team_line, history, missions, votes, question):
+        """Return (prompt, context, marks) for the next call."""
+        with self.lock:
+            if self.round != round_number:
+                self.round = round_number
+                self.reset()
+            context, marks = self.context, self.marks
+        log = self.player.memory['history']
+        # Absolute log positions act as this agent's read cursors
+        current = (log.end, missions.end, votes.end)
+        if context is None:
+            return _full_prompt(self.player, situation, team_line, history, missions, votes, question), None, current
+        # The agent's own lines are already in the context as its replies
+        new_lines = [e for e in log.since(marks[0]) if e['speaker'] != self.player.name][-8:]
+        new_missions = [fact(e) for e in missions.since(marks[1])]
+        new_votes = [fact(e) for e in votes.since(marks[2])]
+        parts = [situation]
+        if new_lines:
+            parts.append("New discussion:\n" + _format_history(new_lines))
+        if new_missions:
+            parts.append("Your new mission actions: " + "; ".join(new_missions))
+        if new_votes:
+            parts.append("Your new votes: " + "; ".join(new_votes))
+        parts.append(team_line)
+        parts.append(question)
+        return "\n".join(parts), context, current
+
+    def keep(self, final, marks):
+        """Adopt the context returned by a finished call as the conversation so far."""
+        context = final.get("context")
+        with self.lock:
+            if context and len(context) <= SESSION_MAX_TOKENS:
+                self.context = context
+                self.marks = marks
+            else:
+                self.reset()
+
+# Serve repeated prompts from the response cache. Decisions are constrained
+# to a couple of answers, so replaying one is harmless; discussion should vary.
+# CACHE_DISCUSSION covers streamed and blocking discussion turns alike.
+CACHE_DECISIONS = True
+CACHE_DISCUSSION = False
+# Sampling for cached decisions, so a replayed answer is the one the model
+# gives for that prompt rather than one random draw frozen in the cache
+DETERMINISTIC_OPTIONS = {"temperature": 0, "seed": 0}
+
+def _decision_options(num_predict):
+    options = {"num_predict": num_predict}
+    if CACHE_DECISIONS:
+        options.update(DETERMINISTIC_OPTIONS)
+    return options
+
+def _request(player, kind, round_number, prompt, cache=False, accept=None, **fields):
+    """One blocking model call, timed into the current game's trace; returns the reply dict."""
+    started = time.perf_counter()
+    final = get_client().request(prompt, cache=cache, accept=accept, **fields)
+    trace = current_trace()
+    if trace is not None:
+        trace.call(kind, getattr(player, 'name', player), round_number, prompt, final, started)
+    return final
+
+def _event(name, player, kind):
+    trace = current_trace()
+    if trace is not None:
+        trace.event(name, player=player.name, kind=kind)
+
+def _ask(player, kind, round_number, situation, team_line, history, missions, votes, question,
+         keep=False, cache=False, accept=None, **fields):
+    """Send one agent turn, through the agent's session when it has one.
+
+    accept is passed to OllamaClient.request; extra keyword arguments are
+    passed through as /api/generate fields.
+    """
+    session = getattr(player, 'session', None)
+    if session is None:
+        prompt = _full_prompt(player, situation, team_line, history, missions, votes, question)
+        PROMPT_STATS.record(kind, round_number, prompt, full=True)
+        return _request(player, kind, round_number, prompt, cache=cache, accept=accept, **fields).get("response", "").strip()
+    prompt, context, marks = session.prompt(round_number, situation, team_line, history, missions, votes, question)
+    PROMPT_STATS.record(kind, round_number, prompt, full=context is None)
+    if context:
+        fields["context"] = context
+    final = _request(player, kind, round_number, prompt, cache=cache, accept=accept, **fields)
+    if keep:
+        session.keep(final, marks)
+    return final.get("response", "").strip()
+
+def _ask_stream(player, round_number, situation, team_line, history, missions, votes, question):
+    """Streaming _ask; discussion turns always extend the session."""
+    session = getattr(player, 'session', None)
+    if session is None:
+        prompt, context, marks = _full_prompt(player, situation, team_line, history, missions, votes, question), None, None
+    else:
+        prompt, context, marks = session.prompt(round_number, situation, team_line, history, missions, votes, question)
+    PROMPT_STATS.record('message', round_number, prompt, full=context is None)
+    fields = {"context": context} if context else {}
+    started, first = time.perf_counter(), None
+    stream = get_client().stream(prompt, cache=CACHE_DISCUSSION, **fields)
+    while True:
+        try:
+            piece = next(stream)
+        except StopIteration as done:
+            final = done.value
+            break
+        if first is None and piece:
+            first = time.perf_counter()
+        yield piece
+    trace = current_trace()
+    if trace is not None:
+        trace.call('message', player.name, round_number, prompt, final or {}, started, first)
+    if session is not None:
+        session.keep(final or {}, marks)
+
+def _message_turn(player, round_number, current_team):
+    session = getattr(player, 'session', None)
+    player_count = session.player_count if session is not None else 7
+    situation = f"Round {round_number} is underway in a {player_count}-player social deduction game."
+    team_line = f"Proposed mission team: {', '.join(p.name for p in current_team)}"
+    question = "Respond in-character as a concise sentence or two. Do not reveal roles."
+    return situation, team_line, question
+
+def _neutral_line(player):
+    rng = getattr(player, 'rng', random)
+    return "Let's give this team a try." if rng.random() < 0.5 else "I agree with the leader."
 
 def ollama_agent_message(player, history, missions, votes, round_number, current_team):
     player_names = [p['speaker'] for p in history[-10:]]
-    history_slice = history[-8:]
-    prompt = AGENT_RULES_CONTEXT + "\n"
-    prompt += (
-        f"You are {player.name}. Round {round_number} is underway in a 7-player social deduction game.\n"
-        f"Proposed mission team: {', '.join(p.name for p in current_team)}\n"
-        f"Your private beliefs: {_format_beliefs(player.memory['beliefs'])}\n"
-        f"Your mission history: {missions}\n"
-        f"Your voting history: {votes}\n"
-        "Recent discussion:\n" + _format_history(history_slice) + "\n\n"
-        "Respond in-character as a concise sentence or two. Do not reveal roles."
-    )
-    data = {
-        "model": "qwen7b",
-        "prompt": prompt,
-        "stream": False
-    }
-    r = requests.post("http://localhost:11434/api/generate", json=data, timeout=30)
-    try:
-        response = r.json().get("response", "").strip()
-    except Exception:
-        lines = r.text.strip().splitlines()
-        response = ""
-        for line in lines:
-            try:
-                obj = json.loads(line)
-                if "response" in obj:
-                    response = obj["response"].strip()
-                    break
-            except Exception:
-                continue
+    situation, team_line, question = _message_turn(player, round_number, current_team)
+    response = _ask(player, 'message', round_number, situation, team_line, history, missions, votes, question,
+                    keep=True, cache=CACHE_DISCUSSION)
     if not response:
+        _event('fallback', player, 'message')
         response = "(remains silent)"
     response = _sanitize_agent_output(response, player_names)
     # If after sanitizing, response is empty, give a neutral fallback
     if not response.strip():
-        response = "Let's give this team a try." if random.random() < 0.5 else "I agree with the leader."
+        _event('fallback', player, 'message')
+        response = _neutral_line(player)
     return response
 
-def ollama_agent_vote(player, team, history, missions, votes, round_number):
+def ollama_agent_message_stream(player, history, missions, votes, round_number, current_team):
+    """Streaming ollama_agent_message: yields sanitized text as tokens arrive."""
     player_names = [p['speaker'] for p in history[-10:]]
-    history_slice = history[-8:]
-    prompt = AGENT_RULES_CONTEXT + "\n"
-    prompt += (
-        f"You are {player.name}. Round {round_number}. A vote to approve the team is happening.\n"
-        f"Proposed team: {', '.join(p.name for p in team)}\n"
-        f"Your private beliefs: {_format_beliefs(player.memory['beliefs'])}\n"
-        f"Your mission history: {missions}\n"
-        f"Your voting history: {votes}\n"
-        "Recent discussion:\n" + _format_history(history_slice) + "\n\n"
-        "Should you vote Approve? Reply ONLY with a single character 'Y' or 'N'."
-    )
-    data = {
-        "model": "qwen7b",
-        "prompt": prompt,
-        "stream": False
+    situation, team_line, question = _message_turn(player, round_number, current_team)
+    sanitizer = StreamSanitizer(player_names)
+    received = False
+    shown = False
+    for piece in _ask_stream(player, round_number, situation, team_line, history, missions, votes, question):
+        if not piece:
+            # The call is on its way; lets the UI put up the speaker's name
+            yield ""
+            continue
+        received = received or bool(piece.strip())
+        out = sanitizer.feed(piece)
+        if out:
+            shown = True
+            yield out
+    out = sanitizer.flush()
+    if out:
+        shown = True
+        yield out
+    # Same fallbacks as the blocking call
+    if not received:
+        _event('fallback', player, 'message')
+        yield "(remains silent)"
+    elif not shown:
+        _event('fallback', player, 'message')
+        yield _neutral_line(player)
+
+# Decision calls ask for {"answer": ...} constrained to the allowed values
+_DECISIONS = {
+    'vote': ("Should you vote Approve?", ('Y', 'N')),
+    'mission': ("Should you help the mission succeed ('P', Pass) or sabotage it ('F', Fail)?", ('P', 'F')),
+}
+# Output tokens allowed for a decision; {"answer": "Y"} is about six
+DECISION_MAX_TOKENS = 8
+
+def _answer_schema(properties, answers):
+    return {
+        "type": "object",
+        "properties": {key: {"type": "string", "enum": list(answers)} for key in properties},
+        "required": list(properties),
     }
-    r = requests.post("http://localhost:11434/api/generate", json=data, timeout=30)
+
+def _load_object(text):
     try:
-        response = r.json().get("response", "").strip().upper()
-    except Exception:
-        lines = r.text.strip().splitlines()
-        response = ""
-        for line in lines:
-            try:
-                obj = json.loads(line)
-                if "response" in obj:
-                    response = obj["response"].strip().upper()
-                    break
-            except Exception:
-                continue
-    if not response or response[0] not in ['Y', 'N']:
-        response = random.choice(['Y', 'N'])
-    return response[0]
+        parsed = json.loads(text)
+    except ValueError:
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
 
-def ollama_agent_mission_action(player, team, history, missions, votes, round_number):
-    player_names = [p['speaker'] for p in history[-10:]]
-    history_slice = history[-8:]
-    prompt = AGENT_RULES_CONTEXT + "\n"
-    prompt += (
-        f"You are {player.name}. Round {round_number}. The mission is underway.\n"
-        f"Mission team: {', '.join(p.name for p in team)}\n"
-        f"Your private beliefs: {_format_beliefs(player.memory['beliefs'])}\n"
-        f"Your mission history: {missions}\n"
-        f"Your voting history: {votes}\n"
-        "Recent discussion:\n" + _format_history(history_slice) + "\n\n"
-        "Should you help the mission succeed or sabotage it? Reply ONLY with 'P' (Pass) or 'F' (Fail)."
+def _valid(value, answers):
+    value = str(value or "").strip().upper()
+    return value if value in answers else None
+
+def _parse_answer(text, answers):
+    return _valid(_load_object(text).get("answer"), answers)
+
+class DecisionStats:
+    """Outcome counts for decision calls, per kind.
+
+    ok: valid on the first try; retried: valid on the short retry;
+    parse_failures: replies that failed validation (up to two per call);
+    fallbacks: calls where both tries failed and the caller chose instead.
+    """
+
+    OUTCOMES = ('ok', 'retried', 'parse_failures', 'fallbacks')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}
+
+    def count(self, kind, outcome):
+        with self.lock:
+            row = self.counts.setdefault(kind, dict.fromkeys(self.OUTCOMES, 0))
+            row[outcome] += 1
+
+    def report(self):
+        with self.lock:
+            return {kind: dict(row) for kind, row in self.counts.items()}
+
+DECISION_STATS = DecisionStats()
+
+def _short_decision_prompt(player, situation, team_line, question):
+    # Retry prompt: no rules block, no discussion, just the decision at hand
+    session = getattr(player, 'session', None)
+    builder = session.builder if session is not None else PromptBuilder(player, "")
+    return (
+        f"You are {player.name} in a social deduction game. {situation}\n"
+        f"{team_line}\n"
+        f"Your private beliefs: {builder.beliefs_text()}\n"
+        f"{question}"
     )
-    data = {
-        "model": "qwen7b",
-        "prompt": prompt,
-        "stream": False
+
+def agent_decision(player, kind, round_number, situation, team_line, history, missions, votes):
+    """Ask the model for one constrained decision ('vote' or 'mission').
+
+    The reply must be JSON {"answer": ...} with one of the allowed values and
+    is capped at DECISION_MAX_TOKENS. An invalid reply is retried once with a
+    much shorter prompt. Returns the answer, or None if both tries failed.
+    """
+    question, answers = _DECISIONS[kind]
+    question += f' Reply ONLY with JSON: {{"answer": "{answers[0]}"}} or {{"answer": "{answers[1]}"}}.'
+    fields = {
+        "priority": DECISION,
+        "format": _answer_schema(["answer"], answers),
+        "options": _decision_options(DECISION_MAX_TOKENS),
+        # Only a reply that parses is cached; a bad one must reach the model again
+        "accept": lambda text: _parse_answer(text.strip(), answers) is not None,
     }
-    r = requests.post("http://localhost:11434/api/generate", json=data, timeout=30)
-    try:
-        response = r.json().get("response", "").strip().upper()
-    except Exception:
-        lines = r.text.strip().splitlines()
-        response = ""
-        for line in lines:
-            try:
-                obj = json.loads(line)
-                if "response" in obj:
-                    response = obj["response"].strip().upper()
-                    break
-            except Exception:
-                continue
-    if not response or response[0] not in ['P', 'F']:
+    response = _ask(player, kind, round_number, situation, team_line, history, missions, votes, question,
+                    cache=CACHE_DECISIONS, **fields)
+    answer = _parse_answer(response, answers)
+    if answer is not None:
+        DECISION_STATS.count(kind, 'ok')
+        return answer
+    DECISION_STATS.count(kind, 'parse_failures')
+    _event('parse_failure', player, kind)
+    prompt = _short_decision_prompt(player, situation, team_line, question)
+    PROMPT_STATS.record(kind + '_retry', round_number, prompt, full=True)
+    reply = _request(player, kind + '_retry', round_number, prompt, cache=CACHE_DECISIONS, **fields)
+    answer = _parse_answer(reply.get("response", "").strip(), answers)
+    if answer is not None:
+        DECISION_STATS.count(kind, 'retried')
+        return answer
+    DECISION_STATS.count(kind, 'parse_failures')
+    DECISION_STATS.count(kind, 'fallbacks')
+    _event('parse_failure', player, kind)
+    _event('fallback', player, kind)
+    return None
+
+def ollama_agent_vote(player, team, history, missions, votes, round_number):
+    situation = f"Round {round_number}. A vote to approve the team is happening."
+    team_line = f"Proposed team: {', '.join(p.name for p in team)}"
+    response = agent_decision(player, 'vote', round_number, situation, team_line, history, missions, votes)
+    if response is None:
+        response = getattr(player, 'rng', random).choice(['Y', 'N'])
+    return response
+
+def ollama_agent_mission_action(player, team, history, missions, votes, round_number):
+    situation = f"Round {round_number}. The mission is underway."
+    team_line = f"Mission team: {', '.join(p.name for p in team)}"
+    response = agent_decision(player, 'mission', round_number, situation, team_line, history, missions, votes)
+    if response is None:
         # Default: good always pass, evil random
-        if player.role in [Role.DON, Role.ASSASSIN, Role.INFILTRATOR]:
-            response = random.choice(['P', 'F'])
+        if player.role in CONSPIRATOR_ROLES:
+            response = getattr(player, 'rng', random).choice(['P', 'F'])
         else:
             response = 'P'
-    return response[0]
\ No newline at end of file
+    return response
+
+# Per-decision wording for batched requests: (situation, question, allowed answers)
+_BATCH_DECISIONS = {
+    'vote': ("A vote to approve the proposed team is happening.",
+             "whether that player votes Approve ('Y') or Reject ('N')", ('Y', 'N')),
+    'mission_action': ("The mission is underway.",
+                       "whether that player plays Pass ('P') or Fail ('F')", ('P', 'F')),
+}
+
+def _private_section(player, builder, max_tokens):
+    builder.summary.update(player.memory['missions'], player.memory['votes'])
+    return (
+        f"=== PRIVATE TO {player.name} ===\n"
+        f"Beliefs: {builder.beliefs_text()}\n"
+        f"Record: {builder.summary.text(max_tokens)}"
+    )
+
+def _batch_prompt(players, decision, team, round_number, budget=PROMPT_TOKEN_BUDGET):
+    """One prompt for several seats, under the same token budget as a single agent's.
+
+    Like PromptBuilder.build: the rules and instructions are fixed costs,
+    each seat's record gets a share of a third of the rest, and recent
+    discussion fills what is left, newest first. Callers only batch seats
+    on the same side, since every section is in front of the same model.
+    """
+    situation, question, answers = _BATCH_DECISIONS[decision]
+    session = getattr(players[0], 'session', None)
+    rules = session.rules if session is not None else AGENT_RULES_CONTEXT
+    names = ", ".join(f'"{p.name}"' for p in players)
+    head = (
+        rules + "\n"
+        f"Round {round_number}. {situation}\n"
+        f"Team: {', '.join(p.name for p in team)}\n"
+    )
+    intro = (
+        "\n\nYou decide separately for each of these players. Each section below is private to "
+        "the player it names: decide for a player using ONLY the public information above "
+        "and that player's own section, never another player's.\n\n"
+    )
+    tail = (
+        "\n\n"
+        f"For each player decide {question}. Reply with a JSON object with exactly the keys "
+        f"{names}, each mapped to \"{answers[0]}\" or \"{answers[1]}\"."
+    )
+    room = budget - estimate_tokens(head) - estimate_tokens(intro) - estimate_tokens(tail)
+    share = max(room // (3 * len(players)), 0)
+    sections = []
+    for p in players:
+        s = getattr(p, 'session', None)
+        if s is None:
+            sections.append(_private_section(p, PromptBuilder(p, rules), share))
+        else:
+            with s.lock:
+                sections.append(_private_section(p, s.builder, share))
+    room -= sum(estimate_tokens(section) + 1 for section in sections)
+    lines, _ = fit_history(players[0].memory['history'], room)
+    return (
+        head + "Recent discussion (public):\n" + "\n".join(lines)
+        + intro + "\n\n".join(sections) + tail
+    )
+
+def ollama_batch_decisions(players, decision, team, round_number):
+    """Ask for several agents' votes or mission cards in one request.
+
+    decision is 'vote' or 'mission_action'. Returns {name: answer} for the
+    answers that parsed and validated; callers fall back per agent for the rest.
+    """
+    answers = _BATCH_DECISIONS[decision][2]
+    prompt = _batch_prompt(players, decision, team, round_number)
+    PROMPT_STATS.record('batch_' + decision, round_number, prompt, full=True)
+    names = [p.name for p in players]
+
+    def complete(text):
+        # Cached only when every seat got a valid answer
+        parsed = _load_object(text.strip())
+        return all(_valid(parsed.get(name), answers) is not None for name in names)
+
+    reply = _request(
+        ",".join(names), 'batch_' + decision, round_number, prompt,
+        cache=CACHE_DECISIONS, accept=complete, priority=DECISION, format=_answer_schema(names, answers),
+        options=_decision_options(DECISION_MAX_TOKENS * len(players)),
+    )
+    parsed = _load_object(reply.get("response", "").strip())
+    results = {}
+    for p in players:
+        value = _valid(parsed.get(p.name), answers)
+        if value is not None:
+            results[p.name] = value
+        else:
+            _event('parse_failure', p, 'batch_' + decision)
+    return results
@@ -0,0 +1,98 @@
+from collections.abc import MutableMapping
+import numpy as np
+
+
+class BeliefMatrix:
+    """Every player's trust scores in one N x N array owned by GameState.
+
+    Row i holds what player i thinks of everyone else (positive = trust,
+    negative = suspicion); the diagonal is always 0. Round updates are whole
+    array operations, and each player reads its row through a BeliefView.
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.scores = np.zeros((len(self.names), len(self.names)))
+        # Bumped on every write so readers can cache anything derived from it
+        self.version = 0
+
+    def view(self, name):
+        return BeliefView(self, self.index[name])
+
+    def add(self, holder, subject, delta):
+        i, j = self.index[holder], self.index[subject]
+        if i != j:
+            self.scores[i, j] += delta
+            self.version += 1
+
+    def mask(self, names):
+        m = np.zeros(len(self.names), dtype=bool)
+        m[[self.index[n] for n in names]] = True
+        return m
+
+    def apply_mission(self, team_names, failed):
+        # Everyone trusts a successful team more and a failed one less
+        self.scores[:, self.mask(team_names)] += -1 if failed else 1
+        np.fill_diagonal(self.scores, 0)
+        self.version += 1
+
+    def apply_votes(self, last_votes):
+        """last_votes: {name: 'Y'/'N'} for players who have voted.
+
+        Players who voted alike gain 0.5 trust in each other; those who split lose 0.5.
+        """
+        sign = np.zeros(len(self.names))
+        for name, vote in last_votes.items():
+            sign[self.index[name]] = 1 if vote == 'Y' else -1
+        # +1 where both voted the same way, -1 where they split, 0 if either has no vote
+        self.scores += 0.5 * np.outer(sign, sign)
+        np.fill_diagonal(self.scores, 0)
+        self.version += 1
+
+
+class BeliefView(MutableMapping):
+    """One player's row of a BeliefMatrix, readable and writable like the old dict."""
+
+    def __init__(self, matrix, row):
+        self.matrix = matrix
+        self.row = row
+
+    def _others(self):
+        return [n for i, n in enumerate(self.matrix.names) if i != self.row]
+
+    def __getitem__(self, name):
+        j = self.matrix.index[name]
+        if j == self.row:
+            raise KeyError(name)
+        return float(self.matrix.scores[self.row, j])
+
+    def __setitem__(self, name, value):
+        j = self.matrix.index[name]
+        if j == self.row:
+            return
+        self.matrix.scores[self.row, j] = value
+        self.matrix.version += 1
+
+    def __delitem__(self, name):
+        raise TypeError("beliefs cannot be removed from a BeliefMatrix")
+
+    def __iter__(self):
+        return iter(self._others())
+
+    def __len__(self):
+        return len(self.matrix.names) - 1
+
+    def _select(self, test):
+        row = self.matrix.scores[self.row]
+        hits = np.flatnonzero(test(row))
+        return [self.matrix.names[j] for j in hits if j != self.row]
+
+    def trusted(self):
+        return self._select(lambda row: row > 0)
+
+    def suspected(self):
+        return self._select(lambda row: row < 0)
+
+    def neutral(self):
+        return self._select(lambda row: row == 0)
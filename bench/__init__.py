@@ -0,0 +1,9 @@
+"""Benchmarks that run without Ollama.
+
+    python -m bench.stub --port 11435          # a fake /api/generate to point OLLAMA_HOST at
+    python -m bench.run --games 5 --out before.json
+
+bench.stub answers like Ollama with configurable latency and failures;
+bench.run plays full GameState games against it with a scripted human and
+writes calls per round, prompt bytes, phase latency and memory growth as JSON.
+"""
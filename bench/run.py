@@ -0,0 +1,174 @@
+"""Play full games against the stub model and report where the work goes.
+
+    python -m bench.run --games 5 --seed 1 --out before.json
+    python -m bench.run --games 5 --llm-decisions --batch-size 4 --token-latency 0.02
+
+Seat 0 is a scripted human (ScriptedUI); the rest are LLM agents talking to
+a bench.stub server started in-process. Output is one JSON document:
+calls and prompt bytes per round, p50/p95 per phase and per kind of call,
+prompt sizes per round, decision outcomes, memory growth across games, and
+what the stub saw.
+"""
+import argparse
+import gc
+import json
+import platform
+import resource
+import subprocess
+import time
+import tracemalloc
+
+import llm
+from cache import ResponseCache
+from agents import DECISION_STATS
+from engine import GameState
+from metrics import percentile
+from prompts import PROMPT_STATS
+from ui import HeadlessUI
+from bench.stub import add_arguments, from_arguments
+
+NAMES = ['Violet', 'Indigo', 'Blue', 'Green', 'Yellow', 'Orange', 'Red']
+
+
+class ScriptedUI(HeadlessUI):
+    """The human seat, answering every prompt from a script without waiting.
+
+    Says each of lines in turn when asked to discuss, then 'done'; approves
+    every team; passes every mission; picks teams in seating order.
+    """
+
+    interactive = True
+
+    def __init__(self, names, lines=("I don't trust this team.",)):
+        self.names = names
+        self.lines = lines
+        self.said = 0
+        self.picks = 0
+
+    def ask(self, prompt):
+        if prompt.startswith('Select player'):
+            self.picks += 1
+            return self.names[(self.picks - 1) % len(self.names)]
+        if 'approve' in prompt:
+            return 'Y'
+        if 'mission action' in prompt:
+            return 'P'
+        # Discussion: each line once per discussion, then done
+        if self.said < len(self.lines):
+            self.said += 1
+            return self.lines[self.said - 1]
+        self.said = 0
+        return 'done'
+
+
+def _commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _spread(values):
+    return {
+        'n': len(values),
+        'p50': percentile(values, 0.5),
+        'p95': percentile(values, 0.95),
+        'max': max(values) if values else 0.0,
+    }
+
+
+def run(games=3, seed=0, stub=None, llm_decisions=(), batch_size=0):
+    """Play games seeded seed..seed+games-1 and return the report dict."""
+    client = llm.use_client(llm.OllamaClient(base_url=stub.url, cache=ResponseCache()))
+    tracemalloc.start()
+    memory = []
+    phases, kinds = {}, {}
+    totals = {'rounds': 0, 'calls': 0, 'prompt_bytes': 0, 'seconds': 0.0}
+    try:
+        for i in range(games):
+            game = GameState(list(NAMES), seed=seed + i, ui=ScriptedUI(NAMES),
+                             llm_decisions=llm_decisions, batch_size=batch_size)
+            t0 = time.perf_counter()
+            result = game.play()
+            totals['seconds'] += time.perf_counter() - t0
+            # Rounds played, counting rejected proposals as rounds of talk
+            totals['rounds'] += sum(1 for s in game.trace.spans if s['name'] == 'discussion')
+            for span in game.trace.spans:
+                phases.setdefault(span['name'], []).append(span['end'] - span['start'])
+            for call in game.trace.calls:
+                if call['cached']:
+                    # Counted by the cache stats below, not as model calls
+                    continue
+                kinds.setdefault(call['kind'], []).append(call)
+                totals['calls'] += 1
+                totals['prompt_bytes'] += call['prompt_bytes']
+            del game, result
+            gc.collect()
+            memory.append(tracemalloc.get_traced_memory()[0])
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        client.close()
+    rounds, calls = totals['rounds'], totals['calls']
+    return {
+        'games': games,
+        'seed': seed,
+        'seconds': totals['seconds'],
+        'rounds': rounds,
+        'calls': calls,
+        'calls_per_round': calls / rounds if rounds else 0.0,
+        'prompt_bytes_per_call': totals['prompt_bytes'] / calls if calls else 0.0,
+        'phases': {name: _spread(d) for name, d in phases.items()},
+        'calls_by_kind': {
+            kind: dict(_spread([c['wall'] for c in rows]),
+                       prompt_bytes_mean=sum(c['prompt_bytes'] for c in rows) / len(rows),
+                       prompt_tokens_mean=sum(c['prompt_tokens'] for c in rows) / len(rows))
+            for kind, rows in kinds.items()
+        },
+        'memory': {
+            # Python allocations still live after each game, and the high-water mark
+            'after_game_kb': [m // 1024 for m in memory],
+            'growth_kb': (memory[-1] - memory[0]) // 1024 if memory else 0,
+            'peak_kb': peak // 1024,
+            'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        },
+        # Estimated prompt tokens per kind of call and per round
+        'prompts': PROMPT_STATS.report(),
+        # Decision calls valid first time, retried, or left to the fallback
+        'decisions': DECISION_STATS.report(),
+        'cache': client.cache.stats(),
+        'scheduler': client.scheduler.report()['by_priority'],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark full games against a stub model server.")
+    parser.add_argument('--games', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first game; game i uses seed+i")
+    parser.add_argument('--llm-decisions', action='store_true', help="let the model vote and play mission cards too")
+    parser.add_argument('--batch-size', type=int, default=0, help="agents per batched decision request")
+    parser.add_argument('--out', help="write the report JSON here as well as to stdout")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    stub = from_arguments(args, seed=args.seed).start()
+    try:
+        report = run(args.games, seed=args.seed, stub=stub,
+                     llm_decisions=('vote', 'mission_action') if args.llm_decisions else (),
+                     batch_size=args.batch_size)
+        report['stub'] = stub.stats()
+    finally:
+        stub.stop()
+    report['config'] = {k: v for k, v in vars(args).items() if k != 'out'}
+    report['commit'] = _commit()
+    report['python'] = platform.python_version()
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(text + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""Throughput of the agent output sanitizer against the chained str.replace version.
+
+    python -m bench.sanitizer --messages 2000 --out sanitizer.json
+
+Whole messages go through _sanitize_agent_output; streams are fed to
+StreamSanitizer a few characters at a time, the way tokens arrive. The
+legacy versions below are the implementations they replaced, kept here
+only as the baseline.
+"""
+import argparse
+import json
+import random
+import time
+
+from agents import SANITIZE_META_PHRASES, SANITIZE_ROLES, StreamSanitizer, _sanitize_agent_output
+
+NAMES = ['Violet', 'Indigo', 'Blue', 'Green', 'Yellow', 'Orange', 'Red']
+
+FRAGMENTS = [
+    "I think {name} has been quiet since the last mission.",
+    "As an AI, I can't say who the {role} is.",
+    "{name} (" + "{role})" + " voted against the team twice.",
+    "{Role}: I trust {name} on this one.",
+    "{name} is not a valid character name, but let's move on.",
+    "The rules say five rejections lose the game::",
+    "Let's give this team a try.",
+    "I agree with the leader, {name} looks clean to me.",
+]
+
+
+def legacy_sanitize(text, player_names):
+    for role in SANITIZE_ROLES:
+        text = text.replace(f"({role})", "").replace(f"{role.capitalize()}: ", "")
+    for name in player_names:
+        text = text.replace(f"{name} is not a valid character name", "")
+        text = text.replace(f"{name} is not a valid role", "")
+    for phrase in SANITIZE_META_PHRASES:
+        text = text.replace(phrase, "")
+    text = text.replace("::", ":").strip()
+    return text
+
+
+class LegacyStreamSanitizer:
+    # Re-sanitizes everything received so far on every chunk
+    def __init__(self, player_names):
+        self.player_names = player_names
+        self.raw = ""
+        self.emitted = 0
+        longest_name = max((len(n) for n in player_names), default=0)
+        self.holdback = max(
+            max(len(r) + 2 for r in SANITIZE_ROLES),
+            longest_name + len(" is not a valid character name"),
+            max(len(m) for m in SANITIZE_META_PHRASES),
+        )
+
+    def feed(self, chunk):
+        self.raw += chunk
+        clean = legacy_sanitize(self.raw, self.player_names)
+        safe_end = len(clean) - self.holdback
+        if safe_end <= self.emitted:
+            return ""
+        out = clean[self.emitted:safe_end]
+        self.emitted = safe_end
+        return out
+
+    def flush(self):
+        clean = legacy_sanitize(self.raw, self.player_names)
+        out = clean[self.emitted:]
+        self.emitted = len(clean)
+        return out
+
+
+def corpus(messages, sentences, seed=0):
+    rng = random.Random(seed)
+    out = []
+    for _ in range(messages):
+        parts = []
+        for _ in range(rng.randint(1, sentences)):
+            role = rng.choice(SANITIZE_ROLES)
+            parts.append(rng.choice(FRAGMENTS).format(name=rng.choice(NAMES), role=role, Role=role.capitalize()))
+        out.append(" ".join(parts))
+    return out
+
+
+def chunked(text, rng):
+    # Roughly token-sized pieces
+    i = 0
+    while i < len(text):
+        n = rng.randint(2, 6)
+        yield text[i:i + n]
+        i += n
+
+
+def _time(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run(messages=2000, sentences=3, repeat=5, seed=0):
+    texts = corpus(messages, sentences, seed)
+    total = sum(len(t) for t in texts)
+    chunks = [list(chunked(t, random.Random(seed + i))) for i, t in enumerate(texts)]
+
+    def whole(sanitize):
+        return lambda: [sanitize(t, NAMES) for t in texts]
+
+    def stream(cls):
+        def go():
+            for pieces in chunks:
+                s = cls(NAMES)
+                for piece in pieces:
+                    s.feed(piece)
+                s.flush()
+        return go
+
+    report = {'messages': messages, 'chars': total}
+    for label, legacy, current in (
+        ('whole', whole(legacy_sanitize), whole(_sanitize_agent_output)),
+        ('stream', stream(LegacyStreamSanitizer), stream(StreamSanitizer)),
+    ):
+        before, after = _time(legacy, repeat), _time(current, repeat)
+        report[label] = {
+            'legacy_mb_s': total / before / 1e6,
+            'current_mb_s': total / after / 1e6,
+            'speedup': before / after,
+        }
+    # Outputs differ where the old version missed mixed-case phrases or cut words short
+    report['changed_outputs'] = sum(1 for t in texts if legacy_sanitize(t, NAMES) != _sanitize_agent_output(t, NAMES))
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the agent output sanitizer.")
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--sentences', type=int, default=3, help="up to this many sentences per message")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per case; the best is kept")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help="write the report JSON here as well as to stdout")
+    args = parser.parse_args(argv)
+    report = run(args.messages, args.sentences, args.repeat, args.seed)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(text + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+"""A local stand-in for Ollama's /api/generate.
+
+Replies are shaped like Ollama's: NDJSON chunks when streaming, one object
+otherwise, with context and the timing fields (prompt_eval_count,
+eval_duration, ...). Latency is simulated per prompt token (prefill) and per
+output token, and is reported back in the duration fields. Decision calls
+that send a JSON schema as format get a random valid answer; anything else
+gets a line of table talk.
+
+failure_rate answers that share of calls with HTTP 500, and malformed_rate
+answers that share of schema calls with prose instead of JSON.
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from llm import DEFAULT_MODEL
+
+# Context window the stub pretends to have; returned contexts never grow past it
+NUM_CTX = 4096
+
+LINES = [
+    "I'm not sure about {name}, they went quiet when the last mission failed.",
+    "This team looks fine to me, {name} has been straight with us.",
+    "I'd swap {name} out, something about their vote bothers me.",
+    "Let's give it a go. If it fails we know where to look.",
+    "{name} pushed hard for this team, which makes me nervous.",
+]
+
+
+def _tokens(text):
+    # Roughly four characters per token, like the models we run
+    return max(1, len(text) // 4)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 0), token_latency=0.005, prompt_latency=0.0002,
+                 load_latency=0.0, failure_rate=0.0, malformed_rate=0.0, seed=None):
+        super().__init__(address, StubHandler)
+        self.token_latency = token_latency
+        self.prompt_latency = prompt_latency
+        self.load_latency = load_latency
+        self.failure_rate = failure_rate
+        self.malformed_rate = malformed_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.counts = dict.fromkeys(('requests', 'streamed', 'failed', 'malformed', 'bytes_in', 'tokens_out'), 0)
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve on a background thread; returns self."""
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def handle_error(self, request, client_address):
+        # Clients drop connections on purpose (cancelled generations, closed pools)
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+    def count(self, **deltas):
+        with self.lock:
+            for key, n in deltas.items():
+                self.counts[key] += n
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counts)
+
+    def draw(self):
+        with self.lock:
+            return self.rng.random()
+
+    def choice(self, options):
+        with self.lock:
+            return self.rng.choice(options)
+
+    def load(self):
+        """Seconds to 'load the model': load_latency once, then nothing."""
+        with self.lock:
+            if self.loaded:
+                return 0.0
+            self.loaded = True
+        return self.load_latency
+
+    def reply_text(self, prompt, schema):
+        if isinstance(schema, dict) and schema.get('properties'):
+            if self.draw() < self.malformed_rate:
+                self.count(malformed=1)
+                return "Sure! I think I'll go along with it."
+            return json.dumps({key: self.choice(spec.get('enum') or ['Y'])
+                               for key, spec in schema['properties'].items()})
+        team = re.search(r"team: ([^\n]+)", prompt, re.IGNORECASE)
+        names = [n.strip() for n in team.group(1).split(',')] if team else ['someone']
+        return self.choice(LINES).format(name=self.choice(names))
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status, obj):
+        body = json.dumps(obj).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _chunk(self, obj):
+        line = (json.dumps(obj) + "\n").encode('utf-8')
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path.startswith('/api/tags'):
+            # Whatever model the game is configured for is 'installed'
+            self._send_json(200, {'models': [{'name': DEFAULT_MODEL}]})
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        server = self.server
+        raw = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        server.count(requests=1, bytes_in=len(raw))
+        if not self.path.startswith('/api/generate'):
+            self._send_json(404, {'error': 'not found'})
+            return
+        data = json.loads(raw or b'{}')
+        if server.draw() < server.failure_rate:
+            server.count(failed=1)
+            self._send_json(500, {'error': 'injected failure'})
+            return
+        prompt = data.get('prompt', '')
+        context = data.get('context') or []
+        prompt_tokens = len(context) + _tokens(prompt)
+        load = server.load()
+        prefill = prompt_tokens * server.prompt_latency
+        time.sleep(load + prefill)
+        words = server.reply_text(prompt, data.get('format')).split(' ')
+        pieces = [w + ' ' for w in words[:-1]] + words[-1:]
+        server.count(tokens_out=len(pieces))
+        final = {
+            'model': data.get('model'),
+            'done': True,
+            'context': list(range(min(prompt_tokens + len(pieces), NUM_CTX))),
+            'prompt_eval_count': prompt_tokens,
+            'eval_count': len(pieces),
+            'load_duration': int(load * 1e9),
+            'prompt_eval_duration': int(prefill * 1e9),
+            'eval_duration': int(len(pieces) * server.token_latency * 1e9),
+        }
+        if data.get('stream', True):
+            server.count(streamed=1)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            try:
+                for piece in pieces:
+                    time.sleep(server.token_latency)
+                    self._chunk({'model': data.get('model'), 'response': piece, 'done': False})
+                self._chunk(dict(final, response=''))
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                # The client cancelled mid-generation
+                self.close_connection = True
+        else:
+            time.sleep(len(pieces) * server.token_latency)
+            self._send_json(200, dict(final, response=''.join(pieces)))
+
+
+def add_arguments(parser):
+    parser.add_argument('--token-latency', type=float, default=0.005, help="seconds per output token")
+    parser.add_argument('--prompt-latency', type=float, default=0.0002, help="seconds per prompt token")
+    parser.add_argument('--load-latency', type=float, default=0.0, help="seconds added to the first call")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="share of calls answered with HTTP 500")
+    parser.add_argument('--malformed-rate', type=float, default=0.0,
+                        help="share of decision calls answered with prose instead of JSON")
+
+
+def from_arguments(args, address=('127.0.0.1', 0), seed=None):
+    return StubServer(address, token_latency=args.token_latency, prompt_latency=args.prompt_latency,
+                      load_latency=args.load_latency, failure_rate=args.failure_rate,
+                      malformed_rate=args.malformed_rate, seed=seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a fake Ollama /api/generate.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11435)
+    parser.add_argument('--seed', type=int)
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    server = from_arguments(args, (args.host, args.port), seed=args.seed)
+    print(f"Stub model at {server.url} (OLLAMA_HOST={server.url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+def cache_key(model, prompt, fields):
+    """Key for one generate call: model, whitespace-normalized prompt and sampling fields."""
+    # keep_alive and stream don't change what the model says
+    fields = {k: v for k, v in fields.items() if k not in ("keep_alive", "stream")}
+    blob = json.dumps([model, " ".join(prompt.split()), fields], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """LRU cache of /api/generate replies, optionally backed by SQLite.
+
+    Lookups hit the in-memory LRU first, then the store at path (if any);
+    anything found on disk is promoted back into memory. Writes go to both,
+    so the store survives restarts.
+    """
+
+    def __init__(self, capacity=1024, path=None):
+        self.capacity = capacity
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.db = None
+        if path:
+            import sqlite3
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            self.db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, reply TEXT)")
+            self.db.commit()
+
+    def get(self, key):
+        with self.lock:
+            reply = self.entries.get(key)
+            if reply is not None:
+                self.entries.move_to_end(key)
+            elif self.db is not None:
+                row = self.db.execute("SELECT reply FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    reply = json.loads(row[0])
+                    self._remember(key, reply)
+            if reply is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return reply
+
+    def put(self, key, reply):
+        with self.lock:
+            self._remember(key, reply)
+            if self.db is not None:
+                self.db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?)", (key, json.dumps(reply)))
+                self.db.commit()
+
+    def _remember(self, key, reply):
+        self.entries[key] = reply
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits, 'misses': self.misses, 'size': len(self.entries),
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def close(self):
+        with self.lock:
+            if self.db is not None:
+                self.db.close()
+                self.db = None
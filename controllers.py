@@ -0,0 +1,167 @@
+from roles import CONSPIRATOR_ROLES
+from policy import HeuristicPolicy
+from agents import (
+    AgentSession, ollama_agent_message, ollama_agent_message_stream,
+    ollama_agent_vote, ollama_agent_mission_action, ollama_batch_decisions,
+)
+
+# Returned by Controller.discuss to end the discussion or skip the rest of it
+DONE = object()
+SKIP = object()
+
+
+class Controller:
+    """Makes the decisions for one seat at the table.
+
+    GameState asks the seat's controller whenever that player has to speak,
+    vote, play a mission card or pick an assassination target.
+    """
+
+    # Calls block on I/O (the model), so the engine runs them on its worker pool
+    concurrent = False
+    # Speaks last in each discussion pass and decides when discussion ends
+    interactive = False
+
+    def setup(self, game, player):
+        pass
+
+    def discuss(self, game, player, team, history):
+        """Return a line (or an iterable of chunks), None to stay quiet, or DONE/SKIP."""
+        return None
+
+    def vote(self, game, player, team):
+        raise NotImplementedError
+
+    def mission_action(self, game, player, team):
+        raise NotImplementedError
+
+    def batchable(self, decision):
+        """True if this seat's decision can share one request with other seats."""
+        return False
+
+    def decide_batch(self, game, players, decision, team):
+        """Decide for several seats at once; returns {name: answer}."""
+        return {p.name: getattr(game.controller(p), decision)(game, p, team) for p in players}
+
+    def suggest_team(self, game, leader, team_size):
+        # Leader plus whoever the discussion has backed most, random among equals
+        others = [p for p in game.players if p is not leader]
+        game.rng.shuffle(others)
+        others.sort(key=lambda p: -game.discussion.standing(p.name).support)
+        return [leader] + others[:team_size-1]
+
+    def choose_target(self, game, player, candidates):
+        return game.rng.choice(candidates)
+
+
+class HumanController(Controller):
+    """The person at the terminal; everything goes through game.ui."""
+
+    interactive = True
+
+    def discuss(self, game, player, team, history):
+        game.ui.say("Your turn to discuss the leader's suggestion (type 'done' to end discussion, or /skip to skip):", style='system', delay=0.01)
+        msg = game.ui.ask('> ').strip()
+        if msg.lower() == '/skip':
+            return SKIP
+        if msg.lower() == 'done':
+            return DONE
+        return msg or None
+
+    def vote(self, game, player, team):
+        game.ui.new_line()
+        vote = game.ui.ask("Do you approve the team? (Y/N): ").strip().upper()
+        game.ui.new_line()
+        return vote
+
+    def mission_action(self, game, player, team):
+        if player.role in CONSPIRATOR_ROLES:
+            return game.ui.ask("Submit your mission action (P)ass/(F)ail): ").strip().upper()
+        return 'P'
+
+
+class PolicyController(Controller):
+    """A silent player whose decisions all come from a policy (HeuristicPolicy by default)."""
+
+    def __init__(self, policy=None):
+        self.policy = policy or HeuristicPolicy()
+
+    def vote(self, game, player, team):
+        return self.policy.vote(game, player, team)
+
+    def mission_action(self, game, player, team):
+        return self.policy.mission_action(game, player, team)
+
+    def suggest_team(self, game, leader, team_size):
+        return self.policy.suggest_team(game, leader, team_size)
+
+    def choose_target(self, game, player, candidates):
+        return self.policy.choose_target(game, player, candidates)
+
+
+class AgentController(PolicyController):
+    """An LLM-driven player backed by Ollama.
+
+    The model always does the table talk. Votes and mission actions come from
+    the policy unless named in llm_decisions ('vote', 'mission_action').
+    """
+
+    def __init__(self, stream=True, policy=None, llm_decisions=(), batch_size=0):
+        super().__init__(policy)
+        # Yield discussion tokens as they arrive instead of a finished line
+        self.stream = stream
+        self.llm_decisions = frozenset(llm_decisions)
+        # Only model-backed decisions are worth sending to the worker pool
+        self.concurrent = bool(self.llm_decisions)
+        # Seats per batched decision request; 0 or 1 asks each agent separately
+        self.batch_size = batch_size
+
+    def batchable(self, decision):
+        return self.batch_size > 1 and decision in self.llm_decisions
+
+    def decide_batch(self, game, players, decision, team):
+        answers = ollama_batch_decisions(players, decision, team, game.round)
+        # Anything missing or malformed falls back to that agent's own call
+        return {
+            p.name: answers.get(p.name) or getattr(game.controller(p), decision)(game, p, team)
+            for p in players
+        }
+
+    def setup(self, game, player):
+        player.session = AgentSession(player, game.table)
+
+    def discuss(self, game, player, team, history):
+        memory = player.memory
+        if self.stream:
+            # Already sanitized chunk by chunk
+            return ollama_agent_message_stream(player, history, memory['missions'], memory['votes'], game.round, team)
+        msg = ollama_agent_message(player, history, memory['missions'], memory['votes'], game.round, team)
+        # Already sanitized, role reveals included
+        if not msg or not msg.strip():
+            msg = "(remains silent)"
+        return msg
+
+    def vote(self, game, player, team):
+        if 'vote' not in self.llm_decisions:
+            return self.policy.vote(game, player, team)
+        memory = player.memory
+        return ollama_agent_vote(player, team, memory['history'][-15:], memory['missions'], memory['votes'], game.round)
+
+    def mission_action(self, game, player, team):
+        if 'mission_action' not in self.llm_decisions:
+            return self.policy.mission_action(game, player, team)
+        memory = player.memory
+        return ollama_agent_mission_action(player, team, memory['history'][-15:], memory['missions'], memory['votes'], game.round)
+
+
+class RandomController(Controller):
+    """Silent coin-flip player for headless runs: Good always passes,
+    Conspirators fail half the time."""
+
+    def vote(self, game, player, team):
+        return game.rng.choice(['Y', 'N'])
+
+    def mission_action(self, game, player, team):
+        if player.role in CONSPIRATOR_ROLES:
+            return game.rng.choice(['P', 'F'])
+        return 'P'
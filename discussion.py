@@ -0,0 +1,108 @@
+"""Running tally of who the table is talking about, and how.
+
+GameState feeds every discussion line to its DiscussionIndex once, as the
+line is logged. One precompiled, word-bounded, case-insensitive pattern
+finds the names in it ("Red" is not in "bored", "Blue" not in "blueprint"),
+and each sentence's wording marks the names in it as endorsed ("I trust
+Red", "I suggest ...") or accused ("Red is suspicious", "swap Blue out").
+Scores decay with every new line, so recent talk counts most.
+
+Two tallies are kept: one for the whole game and one for the current
+discussion phase (reset by begin()). Reading either is a sort over the
+seats, independent of how long the discussion has run.
+"""
+import re
+
+# Sentences, and the halves of "X is fine but Y isn't", are scored separately
+_SENTENCES = re.compile(r"[.!?;\n]+|\bbut\b|\bhowever\b", re.IGNORECASE)
+# Checked first, so "don't trust" is an accusation, not an endorsement
+_ACCUSE = re.compile(
+    r"\b(?:sus|suspicious|suspect\w*|doubt\w*|distrust\w*|liar|lying|lie|traitor|spy|sabotag\w*"
+    r"|nervous|worried|bother\w*|shady|fishy|reject|swap|drop|remove|kick|replace|against|off the team)\b"
+    r"|(?:\bnot|\bnever|\bdont|\bcant|n't)\s+(?:\w+\s+)?(?:trust|sure|buy|like|convinced)\b",
+    re.IGNORECASE,
+)
+_ENDORSE = re.compile(
+    r"\b(?:trust\w*|suggest\w*|support\w*|agree\w*|approve|back|include|keep|like|fine|good|safe|clean"
+    r"|solid|straight|honest|reliable|vouch|confident)\b",
+    re.IGNORECASE,
+)
+
+
+class Standing:
+    __slots__ = ('mentions', 'endorsed', 'accused')
+
+    def __init__(self):
+        self.mentions = 0.0
+        self.endorsed = 0.0
+        self.accused = 0.0
+
+    @property
+    def support(self):
+        return self.endorsed - self.accused
+
+    def scale(self, factor):
+        self.mentions *= factor
+        self.endorsed *= factor
+        self.accused *= factor
+
+
+class DiscussionIndex:
+    def __init__(self, names, half_life=8):
+        # names in seat order, which also breaks ties
+        self.names = list(names)
+        self.lookup = {name.lower(): name for name in self.names}
+        alternatives = "|".join(re.escape(n) for n in sorted(self.names, key=len, reverse=True))
+        self.matcher = re.compile(rf"\b(?:{alternatives})\b", re.IGNORECASE)
+        # Per-line decay: a line's weight halves after half_life more lines
+        self.decay = 0.5 ** (1 / half_life)
+        self.game = {name: Standing() for name in self.names}
+        self.phase = {name: Standing() for name in self.names}
+        self.lines = 0
+
+    def begin(self):
+        """Start a new discussion phase; the game-wide tally carries on."""
+        self.phase = {name: Standing() for name in self.names}
+
+    def add(self, speaker, text):
+        """Score one discussion line."""
+        self.lines += 1
+        for tally in (self.game, self.phase):
+            for standing in tally.values():
+                standing.scale(self.decay)
+        for sentence in _SENTENCES.split(text):
+            named = {self.lookup[m.lower()] for m in self.matcher.findall(sentence)}
+            if not named:
+                continue
+            accused = _ACCUSE.search(sentence) is not None
+            endorsed = not accused and _ENDORSE.search(sentence) is not None
+            for name in named:
+                for standing in (self.game[name], self.phase[name]):
+                    standing.mentions += 1
+                    if accused:
+                        standing.accused += 1
+                    elif endorsed:
+                        standing.endorsed += 1
+
+    def standing(self, name, phase=False):
+        return (self.phase if phase else self.game)[name]
+
+    def ranked(self, phase=False, exclude=()):
+        """Names by support (endorsements less accusations), then mentions, then seat."""
+        tally = self.phase if phase else self.game
+        names = [n for n in self.names if n not in exclude]
+        # Stable sort keeps seat order among equals
+        names.sort(key=lambda n: (-tally[n].support, -tally[n].mentions))
+        return names
+
+    def consensus(self, team_size):
+        """The team_size names this phase's talk backs most, or [] if it backs fewer.
+
+        A name counts as backed once it has been mentioned and not accused
+        more than endorsed.
+        """
+        backed = [n for n in self.ranked(phase=True)
+                  if self.phase[n].mentions > 0 and self.phase[n].support >= 0]
+        if len(backed) < team_size:
+            return []
+        return backed[:team_size]
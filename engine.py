@@ -1,120 +1,189 @@
-from enum import Enum, auto
-import random, time, math
-import curses
-import itertools
+import random, time
+# Start of the clock for --startup-time
+_LAUNCHED = time.perf_counter()
+from concurrent.futures import ThreadPoolExecutor, Future
 from helpers import *
 from aesthetics import *
-from agents import *
-import pyfiglet
-import requests
-import datetime
-
-class Role(Enum):
-    WHISTLEBLOWER = auto()
-    DETECTIVE = auto()
-    COP = auto()
-    PRESIDENT = auto()
-    DON = auto()
-    ASSASSIN = auto()
-    INFILTRATOR = auto()
-    
+from roles import Role, CONSPIRATOR_ROLES
+from controllers import HumanController, AgentController, PolicyController, DONE, SKIP
+from ui import TerminalUI, HeadlessUI
+from pacing import PROFILES
+from render import TERMINAL, SCREEN
+from tables import table_config
+from events import EventLog
+from discussion import DiscussionIndex
+from llm import bind_session, cancel_scope
+from metrics import GameTrace, bind_trace
+from scheduler import CancelToken, Overloaded, SPECULATIVE
+
+# Discussion lines kept in the shared ring; prompts only ever read the last 15
+CHAT_LOG_CAPACITY = 256
+# A player casts at most 25 votes (5 rounds x 5 proposals) and 5 mission cards
+PRIVATE_LOG_CAPACITY = 32
+
 class Player:
     def __init__(self, name, role):
         self.name = name
         self.role = role
         self.alive = True
         self.known_roles = {}
+        # AgentSession holding this player's model context (agents only)
+        self.session = None
+        # Draws for this player's agent fallbacks; seeded by GameState
+        self.rng = random.Random()
+        # Private overlay for what only this player sees: own votes and mission cards
+        self.log = EventLog(capacity=PRIVATE_LOG_CAPACITY)
         self.memory = {
+            # Live view of the shared discussion log, attached by GameState
             "history": [],
-            "missions": [],
-            "votes": [],
-            # beliefs: {player_name: trust_score}, positive = trust, negative = suspicion
+            "missions": self.log.view('mission'),
+            "votes": self.log.view('vote'),
+            # beliefs: {player_name: trust_score}, positive = trust, negative = suspicion;
+            # replaced by a BeliefView in initialize_beliefs
             "beliefs": {}
         }
     
-    def receive_initial_info(self, all_players):
+    def receive_initial_info(self, by_role):
+        # by_role: {Role: [players]}, built once by GameState
+        don = by_role.get(Role.DON, [])
+        assassin = by_role.get(Role.ASSASSIN, [])
         if self.role == Role.WHISTLEBLOWER:
             # Whistleblower knows Don and Assassin
-            don = next(p for p in all_players if p.role == Role.DON)
-            assassin = next(p for p in all_players if p.role == Role.ASSASSIN)
-            self.known_roles[Role.DON] = [don]
-            self.known_roles[Role.ASSASSIN] = [assassin]
+            self.known_roles[Role.DON] = list(don)
+            self.known_roles[Role.ASSASSIN] = list(assassin)
         elif self.role == Role.DETECTIVE:
             # Detective knows two candidates: Whistleblower & Don (ambiguous)
-            wb = next(p for p in all_players if p.role == Role.WHISTLEBLOWER)
-            don = next(p for p in all_players if p.role == Role.DON)
-            self.known_roles['detective_candidates'] = [wb, don]
+            self.known_roles['detective_candidates'] = by_role.get(Role.WHISTLEBLOWER, []) + don
         elif self.role == Role.INFILTRATOR:
             # Infiltrator knows Don and Assassin
-            don = next(p for p in all_players if p.role == Role.DON)
-            assassin = next(p for p in all_players if p.role == Role.ASSASSIN)
-            self.known_roles[Role.DON] = [don]
-            self.known_roles[Role.ASSASSIN] = [assassin]
+            self.known_roles[Role.DON] = list(don)
+            self.known_roles[Role.ASSASSIN] = list(assassin)
         elif self.role == Role.DON:
             # Don knows Assassin
-            assassin = next(p for p in all_players if p.role == Role.ASSASSIN)
-            self.known_roles[Role.ASSASSIN] = [assassin]
+            self.known_roles[Role.ASSASSIN] = list(assassin)
         elif self.role == Role.ASSASSIN:
             # Assassin knows Don
-            don = next(p for p in all_players if p.role == Role.DON)
-            self.known_roles[Role.DON] = [don]
+            self.known_roles[Role.DON] = list(don)
         # Cop, President have no initial info
 
-    def initialize_beliefs(self, all_players):
-        # Start neutral (0) for all other players
-        for p in all_players:
-            if p.name != self.name:
-                self.memory["beliefs"][p.name] = 0
+    def initialize_beliefs(self, matrix):
+        # Beliefs are a live view of this player's row in the shared
+        # BeliefMatrix; every score starts neutral (0)
+        self.memory["beliefs"] = matrix.view(self.name)
 
     def update_belief(self, player_name, delta):
         # Adjust trust/suspicion for a player
-        if player_name == self.name:
-            return
-        if player_name not in self.memory["beliefs"]:
-            self.memory["beliefs"][player_name] = 0
-        self.memory["beliefs"][player_name] += delta
+        self.memory["beliefs"].matrix.add(self.name, player_name, delta)
 
     def get_trusted(self):
         # Return list of players this agent trusts (trust_score > 0)
-        return [name for name, score in self.memory["beliefs"].items() if score > 0]
+        return self.memory["beliefs"].trusted()
 
     def get_suspected(self):
         # Return list of players this agent suspects (trust_score < 0)
-        return [name for name, score in self.memory["beliefs"].items() if score < 0]
+        return self.memory["beliefs"].suspected()
+
+# Upper bound on concurrent agent requests; six agents at a seven-seat table
+AGENT_WORKERS = 6
+
+class GameOver(Exception):
+    """Raised by game_over to unwind out of whichever phase ended the game."""
 
 class GameState:
-    def __init__(self, player_names):
+    def __init__(self, player_names, stream_discussion=True, seed=None, controllers=None,
+                 ui=None, headless=False, discussion_passes=1, llm_decisions=(), batch_size=0,
+                 session=None):
+        """Set up a table.
+
+        By default the first name is the human at the terminal and the rest
+        are LLM agents that talk through the model and decide through
+        HeuristicPolicy; llm_decisions ('vote', 'mission_action') hands those
+        decisions to the model too, and batch_size > 1 asks for up to that
+        many agents' decisions in a single request. headless=True drops all terminal I/O and
+        waits and, unless controllers are given, seats PolicyControllers.
+        controllers maps player name -> Controller for any seat to override.
+        session labels this game's LLM calls (see llm.bind_session) when
+        several games share one backend. Phases and agent calls are timed
+        into self.trace (see metrics.py).
+        """
         self.players = []
-        self.leader_index = random.randint(0, 6)
+        # Game logic draws from self.rng so a seed reproduces a game; cosmetic
+        # timing jitter stays on the module-level random
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = random.Random(self.seed)
+        self.ui = ui or (HeadlessUI() if headless else TerminalUI())
+        # Discussion passes to run when no interactive player is seated
+        self.discussion_passes = discussion_passes
+        # Role mix and mission sizes for this many seats (5-10)
+        self.table = table_config(len(player_names))
+        self.leader_index = self.rng.randrange(len(player_names))
         self.round = 1
         self.successes = 0
         self.failures = 0
         self.failed_votes = 0
         self.mission_history = []
+        self.result = None
+        # Agent LLM calls for a phase are fanned out on this pool
+        self.session = session
+        self.trace = GameTrace(session)
+        self.executor = ThreadPoolExecutor(max_workers=AGENT_WORKERS, initializer=_bind_worker,
+                                           initargs=(session, self.trace))
+        # Votes started during discussion: (round, team names, history mark) -> (CancelToken, {name: future})
+        self._speculative = {}
+        # Shared discussion log; every player reads it through a view
+        self.log = EventLog(capacity=CHAT_LOG_CAPACITY)
+        self.chat = self.log.view('chat')
         self.assign_roles(player_names)
-        human_name = player_names[0]
-        self.human = next(p for p in self.players if p.name == human_name)
+        # Who the discussion backs and accuses, updated as each line is logged
+        self.discussion = DiscussionIndex([p.name for p in self.players])
+        self.controllers = {}
+        for i, p in enumerate(self.players):
+            if controllers and p.name in controllers:
+                self.controllers[p.name] = controllers[p.name]
+            elif headless:
+                self.controllers[p.name] = PolicyController()
+            elif i == 0:
+                self.controllers[p.name] = HumanController()
+            else:
+                self.controllers[p.name] = AgentController(stream=stream_discussion, llm_decisions=llm_decisions, batch_size=batch_size)
+        # The (first) interactive seat, if any; None for all-bot tables
+        self.human = next((p for p in self.players if self.controller(p).interactive), None)
         self.distribute_initial_info()
-        # Initialize beliefs for all players
+        # All trust scores live in one matrix; players see their own row.
+        # numpy loads here, not at launch, to keep it off the path to the menu
+        from beliefs import BeliefMatrix
+        self.beliefs = BeliefMatrix([p.name for p in self.players])
         for p in self.players:
-            p.initialize_beliefs(self.players)
+            p.initialize_beliefs(self.beliefs)
+            self.controller(p).setup(self, p)
+
+    def controller(self, player):
+        return self.controllers[player.name]
 
     def assign_roles(self, names):
-        roles = [
-            Role.WHISTLEBLOWER, Role.DETECTIVE, Role.COP, Role.PRESIDENT,
-            Role.DON, Role.ASSASSIN, Role.INFILTRATOR
-        ]
-        random.shuffle(roles)
+        roles = list(self.table.roles)
+        self.rng.shuffle(roles)
         for name, role in zip(names, roles):
-            self.players.append(Player(name, role))
+            player = Player(name, role)
+            player.rng.seed(f"{self.seed}:{name}")
+            player.memory['history'] = self.chat
+            self.players.append(player)
+        # Lookup indexes, built once: name -> player, role -> players, name -> seat
+        self.by_name = {p.name: p for p in self.players}
+        self.by_role = {}
+        for p in self.players:
+            self.by_role.setdefault(p.role, []).append(p)
+        self.seat = {p.name: i for i, p in enumerate(self.players)}
 
     def distribute_initial_info(self):
         for player in self.players:
-            player.receive_initial_info(self.players)
+            player.receive_initial_info(self.by_role)
             
+    def fails_needed(self):
+        return 2 if self.round in self.table.double_fail_rounds else 1
+
     def get_team_size(self):
-        sizes = [3, 4, 4, 5, 5]
-        return sizes[self.round - 1]
+        return self.table.mission_sizes[self.round - 1]
 
     def rotate_leader(self):
         self.leader_index += 1
@@ -127,319 +196,471 @@ class GameState:
 
         team = []
         if leader is self.human:
-            styled_print(f"{leader.name} is the leader.", style='system', delay=0.05)
-            styled_print(f"Propose a team of {team_size} members.", style='system', delay=0.05)
+            self.ui.say(f"{leader.name} is the leader.", style='system', delay=0.05)
+            self.ui.say(f"Propose a team of {team_size} members.", style='system', delay=0.05)
         while len(team) < team_size:
-            choice = input(f"Select player {len(team)+1}: ").strip().capitalize()
-            candidate = next((p for p in self.players if p.name == choice), None)
+            choice = self.ui.ask(f"Select player {len(team)+1}: ").strip().capitalize()
+            candidate = self.by_name.get(choice)
             if candidate and candidate not in team:
                 team.append(candidate)
             else:
-                    styled_print("Invalid or duplicate selection.", style='warning', delay=0.02)
+                    self.ui.say("Invalid or duplicate selection.", style='warning', delay=0.02)
         else:
-            styled_print(f"{leader.name} is the leader.", style='system', delay=random.uniform(2, 4.2))
-            team = random.sample(self.players, team_size)
-            styled_print(f"{leader.name} proposes: {', '.join([p.name for p in team])}", style='player', delay=0.05)
+            self.ui.say(f"{leader.name} is the leader.", style='system', delay=random.uniform(2, 4.2))
+            team = self.rng.sample(self.players, team_size)
+            self.ui.say(f"{leader.name} proposes: {', '.join([p.name for p in team])}", style='player', delay=0.05)
         return team
+
+    def _decide(self, player, decision, team, token=None):
+        # Blocking (LLM) controllers go to the worker pool; the rest answer
+        # inline, wrapped in a finished Future so both are awaited the same way
+        ctrl = self.controller(player)
+        call = getattr(ctrl, decision)
+        if ctrl.concurrent:
+            return self.executor.submit(self._scoped, token, call, self, player, team)
+        future = Future()
+        future.set_result(call(self, player, team))
+        return future
             
+    def _fan_out(self, players, decision, team, token=None):
+        # Futures for every player's decision. Seats whose controller can
+        # batch share one request per batch_size seats; the rest go one by one.
+        # A batch never mixes sides: all its seats' private sections go to one model call.
+        # With a token, worker calls run under it and can be cancelled
+        pending = {}
+        batchable = [p for p in players if self.controller(p).batchable(decision)]
+        for conspirators in (True, False):
+            batch = [p for p in batchable if (p.role in CONSPIRATOR_ROLES) == conspirators]
+            if not batch:
+                continue
+            ctrl = self.controller(batch[0])
+            for i in range(0, len(batch), ctrl.batch_size):
+                chunk = batch[i:i + ctrl.batch_size]
+                futures = {p.name: Future() for p in chunk}
+                pending.update(futures)
+                self.executor.submit(self._scoped, token, self._run_batch, ctrl, chunk, decision, team, futures)
+        for p in players:
+            if p.name not in pending:
+                pending[p.name] = self._decide(p, decision, team, token)
+        return pending
+
+    def _scoped(self, token, call, *args):
+        # A call shed by the scheduler under load returns None; callers that
+        # still need the answer ask again
+        if token is None:
+            return call(*args)
+        with cancel_scope(token):
+            try:
+                return call(*args)
+            except Overloaded:
+                return None
+
+    def _run_batch(self, ctrl, chunk, decision, team, futures):
+        try:
+            answers = ctrl.decide_batch(self, chunk, decision, team)
+            for p in chunk:
+                futures[p.name].set_result(answers[p.name])
+        except Overloaded:
+            for future in futures.values():
+                future.set_result(None)
+        except Exception as e:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+
     def vote_on_team(self, team):
-        styled_print("\nVoting phase: Approve or Reject the proposed team.\n", style='system', delay=0.05)
+        self.ui.say("\nVoting phase: Approve or Reject the proposed team.\n", style='system', delay=0.05)
         votes = {}
         voting_order = self.players[:]
-        random.shuffle(voting_order)
-        for p in voting_order:
-            if p is self.human:
-                new_line()
-                vote = input("Do you approve the team? (Y/N): ").strip().upper()
-                new_line()
+        self.rng.shuffle(voting_order)
+        # Ask every agent at once; votes are still revealed in voting order
+        pending = self._take_speculative_votes(team)
+        pending.update(self._fan_out(
+            [p for p in voting_order if not self.controller(p).interactive and p.name not in pending], 'vote', team
+        ))
+        # Reveals that come together go out as one write
+        with self.ui.frame():
+            for p in voting_order:
+                if self.controller(p).interactive:
+                    vote = self.controller(p).vote(self, p, team)
+                else:
+                    vote = self._await_agent(pending[p.name])
+                    if vote is None:
+                        # Its speculative vote was shed under load; ask for real
+                        vote = self._await_agent(self._decide(p, 'vote', team))
+                votes[p.name] = vote
+                self.ui.say(f"{p.name} voted {'Approve' if vote == 'Y' else 'Reject' }.", style='player' if p is not self.human else 'system', delay=0.03)
+                # Update memory for this vote
+                p.log.append('vote', self.round, p.name, vote, [x.name for x in team])
+
+            approvals = sum(1 for v in votes.values() if v == 'Y')
+            if approvals > len(self.players) // 2:
+                self.ui.new_line()
+                self.ui.say("Team approved.", style='system', delay=0.08)
+                self.ui.new_line()
+                return True
             else:
-                time.sleep(random.uniform(0.8, 2.2))  # Simulate real player thinking
-                vote = agent_vote(p, team, p.memory, p.memory['history'][-15:], self.round)
-            votes[p.name] = vote
-            styled_print(f"{p.name} voted {'Approve' if vote == 'Y' else 'Reject' }.", style='player' if p is not self.human else 'system', delay=0.03)
-            # Update memory for this vote
-            p.memory['votes'].append({'round': self.round, 'team': [x.name for x in team], 'vote': vote})
-
-        approvals = sum(1 for v in votes.values() if v == 'Y')
-        if approvals > len(self.players) // 2:
-            new_line()
-            styled_print("Team approved.", style='system', delay=0.08)
-            new_line()
-            return True
-        else:
-            new_line()
-            styled_print("Team rejected.", style='warning', delay=0.08)
-            new_line()
-            self.failed_votes += 1
-            return False
+                self.ui.new_line()
+                self.ui.say("Team rejected.", style='warning', delay=0.08)
+                self.ui.new_line()
+                self.failed_votes += 1
+                return False
         
+    def _history_mark(self):
+        # Position in the shared discussion log identifies the discussion
+        # state a vote was computed from
+        return self.chat.end
+
+    def _speculate_votes(self, teams):
+        # Start agent votes for the teams most likely to be put to the vote,
+        # so they run while the human is still typing
+        mark = self._history_mark()
+        for key in [k for k in self._speculative if k[2] != mark]:
+            self._cancel_speculation(*self._speculative.pop(key))
+        for team in teams:
+            if not team:
+                continue
+            key = (self.round, tuple(p.name for p in team), mark)
+            if key in self._speculative:
+                continue
+            # Runs behind real decisions and discussion, and stops the moment it goes stale
+            token = CancelToken(SPECULATIVE)
+            self._speculative[key] = (token, self._fan_out(
+                [p for p in self.players if self.controller(p).concurrent], 'vote', team, token
+            ))
+
+    @staticmethod
+    def _cancel_speculation(token, futures):
+        for future in futures.values():
+            future.cancel()
+        # Calls already running are dropped at the backend
+        token.cancel()
+
+    def _take_speculative_votes(self, team):
+        # Votes precomputed for exactly this team and discussion state are
+        # used as-is; everything else is thrown away
+        key = (self.round, tuple(p.name for p in team), self._history_mark())
+        _, ready = self._speculative.pop(key, (None, {}))
+        for stale in self._speculative.values():
+            self._cancel_speculation(*stale)
+        self._speculative.clear()
+        return ready
+
+    def _await_agent(self, future):
+        # A short beat between reveals; time spent waiting on the model
+        # counts toward it, so a slow answer adds no extra pause
+        self.ui.pause(random.uniform(0.2, 0.6))
+        if not future.done():
+            # Inside a reveal frame, show what is out so far while it finishes
+            self.ui.flush()
+        return future.result()
+
     def execute_mission(self, team):
-        fails_needed = 2 if self.round == 4 else 1
-        styled_print(f"\nMission {self.round} begins. {fails_needed} fail vote(s) required to fail.\n", style='dramatic', delay=0.07)
+        fails_needed = self.fails_needed()
+        self.ui.say(f"\nMission {self.round} begins. {fails_needed} fail vote(s) required to fail.\n", style='dramatic', delay=0.07)
         fail_votes = 0
 
         action_order = team[:]
-        random.shuffle(action_order)
-        for p in action_order:
-            if p is self.human:
-                if self.human.role in {Role.DON, Role.ASSASSIN, Role.INFILTRATOR}:
-                    vote = input("Submit your mission action (P)ass/(F)ail): ").strip().upper()
+        self.rng.shuffle(action_order)
+        pending = self._fan_out([p for p in action_order if not self.controller(p).interactive], 'mission_action', team)
+        # Reveals that come together go out as one write
+        with self.ui.frame():
+            for p in action_order:
+                if self.controller(p).interactive:
+                    vote = self.controller(p).mission_action(self, p, team)
                 else:
-                    vote = 'P'
+                    vote = self._await_agent(pending[p.name])
+                if vote == 'F':
+                    fail_votes += 1
+                # Update memory for this mission action
+                p.log.append('mission', self.round, p.name, vote, [x.name for x in team])
+
+            mission_failed = fail_votes >= fails_needed
+            self.mission_history.append({'round': self.round, 'team': [x.name for x in team], 'fails': fail_votes, 'failed': mission_failed})
+            if mission_failed:
+                self.ui.say("Mission FAILED.", style='error', delay=0.12, typewriter=True)
+                self.failures += 1
+                if self.failures == 3:
+                    self.game_over(False, 'missions')
             else:
-                time.sleep(random.uniform(0.8, 2.2))  # Simulate real player thinking
-                vote = agent_mission_action(p, team, p.memory, p.memory['history'][-15:], self.round)
-            if vote == 'F':
-                fail_votes += 1
-            # Update memory for this mission action
-            p.memory['missions'].append({'round': self.round, 'team': [x.name for x in team], 'action': vote})
-
-        mission_failed = fail_votes >= fails_needed
-        if mission_failed:
-            styled_print("Mission FAILED.", style='error', delay=0.12, typewriter=True)
-            self.failures += 1
-            if self.failures == 3:
-                self.game_over(False)
-        else:
-            styled_print("Mission SUCCEEDED.", style='system', delay=0.12, typewriter=True)
-            self.successes += 1
-            if self.successes == 3:
-                self.assassin_phase()
+                self.ui.say("Mission SUCCEEDED.", style='system', delay=0.12, typewriter=True)
+                self.successes += 1
+                if self.successes == 3:
+                    self.assassin_phase()
         # Update beliefs after mission
         self.update_beliefs_after_round(team, mission_failed)
         self.round += 1
         self.failed_votes = 0
-        new_line()
+        self.ui.new_line()
 
     def update_beliefs_after_round(self, team, mission_failed):
-        # Agents update beliefs based on mission outcome and voting patterns
-        for agent in self.players:
-            # Mission outcome: adjust beliefs for team members
-            for p in team:
-                if p.name == agent.name:
-                    continue
-                if mission_failed:
-                    agent.update_belief(p.name, -1)  # More suspicious
-                else:
-                    agent.update_belief(p.name, 1)   # More trusting
-            # Voting pattern: trust those who voted the same, suspect those who didn't
-            if agent.memory['votes']:
-                last_vote = agent.memory['votes'][-1]
-                agent_vote = last_vote['vote']
-                for other in self.players:
-                    if other.name == agent.name or not other.memory['votes']:
-                        continue
-                    other_vote = other.memory['votes'][-1]['vote']
-                    if agent_vote == other_vote:
-                        agent.update_belief(other.name, 0.5)
-                    else:
-                        agent.update_belief(other.name, -0.5)
-
-    def game_over(self, good_won):
-        styled_print("\n" + ("The good guys win." if good_won else "Conspirators win."), style='dramatic', delay=0.15, typewriter=True)
-        exit()
+        # Agents update beliefs based on mission outcome and voting patterns:
+        # team members are trusted more after a success and less after a
+        # failure; players who voted alike trust each other, splits suspect
+        self.beliefs.apply_mission([p.name for p in team], mission_failed)
+        self.beliefs.apply_votes({p.name: p.memory['votes'][-1]['vote'] for p in self.players if p.memory['votes']})
+
+    def game_over(self, good_won, reason=''):
+        self.ui.say("\n" + ("The good guys win." if good_won else "Conspirators win."), style='dramatic', delay=0.15, typewriter=True)
+        self.result = {
+            'seed': self.seed,
+            'good_won': good_won,
+            'reason': reason,
+            'rounds': self.round,
+            'successes': self.successes,
+            'failures': self.failures,
+            # One entry per seat, in the order names were given
+            'seats': [
+                {'name': p.name, 'role': p.role.name, 'won': good_won != (p.role in CONSPIRATOR_ROLES)}
+                for p in self.players
+            ],
+        }
+        raise GameOver()
 
     def assassin_phase(self):
-        assassin = next(p for p in self.players if p.role == Role.ASSASSIN)
-        guess = random.choice([p for p in self.players if p != assassin]) #### Placeholder
+        assassin = self.by_role[Role.ASSASSIN][0]
+        candidates = [p for p in self.players if p != assassin]
+        with self.trace.span('assassin'):
+            guess = self.controller(assassin).choose_target(self, assassin, candidates) #### Placeholder
 
         if guess.role == Role.WHISTLEBLOWER:
-            styled_print("Wrong.", style='system', delay=1)
-            styled_print(f"Assassin guessed: {guess.name}", style='player', delay=0.08)
-            styled_print("Conspirators win.", style='system', delay=0.1)
-            self.game_over(False)
+            self.ui.say("Wrong.", style='system', delay=1)
+            self.ui.say(f"Assassin guessed: {guess.name}", style='player', delay=0.08)
+            self.ui.say("Conspirators win.", style='system', delay=0.1)
+            self.game_over(False, 'assassination')
         else:
-            styled_print("The Truth Prevails.", style='system', delay=0.1)
-            self.game_over(True)
+            self.ui.say("The Truth Prevails.", style='system', delay=0.1)
+            self.game_over(True, 'missions')
 
     def get_leader(self):
         return self.players[self.leader_index]
 
     def suggest_team(self, leader, team_size):
-        # Heuristic: pick self + most trusted (least accused, most agreed with, not failed missions)
-        # For now, just pick self + random others, but can be improved
-        trusted = [p for p in self.players if p != leader]
-        random.shuffle(trusted)
-        team = [leader] + trusted[:team_size-1]
-        return team
+        return self.controller(leader).suggest_team(self, leader, team_size)
+
+    def get_consensus_team(self, team_size):
+        # The team this phase's discussion backs most, in seat order; [] if it backs too few
+        names = self.discussion.consensus(team_size)
+        return sorted((self.by_name[name] for name in names), key=lambda p: self.seat[p.name])
 
-    def get_consensus_team(self, discussion_history, team_size):
-        # Find the most frequently mentioned team in the last N discussion messages
-        mentions = {}
-        for msg in discussion_history[-15:]:
-            text = msg['text'].lower()
-            for p in self.players:
-                if p.name.lower() in text:
-                    mentions[p.name] = mentions.get(p.name, 0) + 1
-        # Pick top N mentioned players
-        sorted_mentions = sorted(mentions.items(), key=lambda x: -x[1])
-        consensus_team = [name for name, _ in sorted_mentions[:team_size]]
-        # If not enough consensus, return empty
-        if len(consensus_team) < team_size:
-            return []
-        # Map names back to player objects
-        return [p for p in self.players if p.name in consensus_team]
+    def _add_to_history(self, speaker, text):
+        # One append to the shared log; every player's history view sees it
+        self.log.append('chat', self.round, speaker.name, text)
+        self.discussion.add(speaker.name, text)
 
     def discussion_phase(self, leader, team_size):
-        styled_print(f"\n[DISCUSSION PHASE] Leader is {leader.name}. They will start by suggesting a team of {team_size}.", style='dramatic', delay=0.04)
-        new_line()
+        self.ui.say(f"\n[DISCUSSION PHASE] Leader is {leader.name}. They will start by suggesting a team of {team_size}.", style='dramatic', delay=0.04)
+        self.ui.new_line()
+        self.discussion.begin()
         # Leader suggests a team
         leader_team = self.suggest_team(leader, team_size)
         leader_team_names = ', '.join([p.name for p in leader_team])
-        styled_print(f"{leader.name} (Leader) suggests: {leader_team_names}", style='player', delay=0.04)
-        discussion_history = [{'round': self.round, 'speaker': leader.name, 'text': f"I suggest {leader_team_names} for the mission."}]
-        for pl in self.players:
-            pl.memory['history'].append(discussion_history[0])
-        # Discussion loop: repeat until human types 'done' or '/skip'
+        self.ui.say(f"{leader.name} (Leader) suggests: {leader_team_names}", style='player', delay=0.04)
+        # This phase's slice of the shared log
+        discussion_history = self.chat.since(self.chat.end)
+        self._add_to_history(leader, f"I suggest {leader_team_names} for the mission.")
+        # Discussion loop: repeat until the human types 'done' or '/skip'
+        # (or for discussion_passes passes when nobody at the table is interactive)
         done = False
         skip_discussion = False
+        passes = 0
         while not done and not skip_discussion:
-            # Always ensure human is included in the round, after all agents
-            agent_speakers = [p for p in self.players if p is not leader and p is not self.human]
-            random.shuffle(agent_speakers)
-            speakers = agent_speakers + [self.human]  # Human always last in the round
+            # Interactive players always speak last in the pass, even when leading
+            agent_speakers = [p for p in self.players if p is not leader and not self.controller(p).interactive]
+            self.rng.shuffle(agent_speakers)
+            speakers = agent_speakers + [p for p in self.players if self.controller(p).interactive]
             for p in speakers:
-                if p is leader:
-                    continue  # Leader already spoke
-                if p is self.human:
-                    styled_print("Your turn to discuss the leader's suggestion (type 'done' to end discussion, or /skip to skip):", style='system', delay=0.01)
-                    msg = input('> ').strip()
-                    if msg.lower() == '/skip':
-                        styled_print("[Discussion skipped]", style='warning', delay=0.01)
+                ctrl = self.controller(p)
+                if ctrl.interactive:
+                    self._speculate_votes([leader_team, self.get_consensus_team(team_size)])
+                    msg = ctrl.discuss(self, p, leader_team, discussion_history[-15:])
+                    if msg is SKIP:
+                        self.ui.say("[Discussion skipped]", style='warning', delay=0.01)
                         skip_discussion = True
                         break
-                    if msg.lower() == 'done':
+                    if msg is DONE:
                         done = True
                         break
                     if msg:
-                        entry = {'round': self.round, 'speaker': p.name, 'text': msg}
-                        discussion_history.append(entry)
-                        styled_print(f"{p.name}: {msg}", style='system', delay=0.01)
-                        for pl in self.players:
-                            pl.memory['history'].append(entry)
+                        self._add_to_history(p, msg)
+                        self.ui.say(f"{p.name}: {msg}", style='system', delay=0.01)
+                    continue
+                agent_msg = ctrl.discuss(self, p, leader_team, discussion_history[-15:])
+                if agent_msg is None:
+                    continue
+                if isinstance(agent_msg, str):
+                    self.ui.say(f"{p.name}: {agent_msg}", style='player', delay=0.04)
                 else:
-                    agent_msg = agent_discussion(p, leader_team, p.memory, discussion_history[-15:], self.round)
-                    if not agent_msg or not agent_msg.strip():
-                        agent_msg = "(remains silent)"
-                    # Remove any role reveals
-                    for role in ["cop", "detective", "president", "don", "assassin", "infiltrator", "whistleblower"]:
-                        agent_msg = agent_msg.replace(f"({role})", "").replace(f"{role.capitalize()}: ", "")
-                    entry = {'round': self.round, 'speaker': p.name, 'text': agent_msg}
-                    discussion_history.append(entry)
-                    styled_print(f"{p.name}: {agent_msg}", style='player', delay=0.04)
-                    for pl in self.players:
-                        pl.memory['history'].append(entry)
-                    time.sleep(random.uniform(0.7, 1.7))
-        new_line()
-        styled_print("[Discussion phase ended]", style='dramatic', delay=0.01)
-        new_line()
+                    # Tokens are shown as they arrive
+                    agent_msg = self.ui.say_stream(agent_msg, style='player', lead=f"{p.name}: ", delay=0.04)
+                self._add_to_history(p, agent_msg)
+                self.ui.pause(random.uniform(0.7, 1.7))
+            passes += 1
+            if self.human is None and passes >= self.discussion_passes:
+                done = True
+        self.ui.new_line()
+        self.ui.say("[Discussion phase ended]", style='dramatic', delay=0.01)
+        self.ui.new_line()
         # Try to get consensus team
-        consensus_team = self.get_consensus_team(discussion_history, team_size)
+        consensus_team = self.get_consensus_team(team_size)
         if consensus_team:
             return consensus_team
         else:
             return leader_team
 
-    def start(self):
-        clear_screen()
-        time.sleep(2)
-        styled_print(f"Your codename is {self.human.name}", style='system', delay=0.08)
-        time.sleep(2)
-        styled_print(f"You are the {self.human.role.name.capitalize()}", style='dramatic', delay=0.12, typewriter=True)
-        time.sleep(4)
-        clear_screen()
-        curses.wrapper(transition)
-        time.sleep(1)
-        while self.round <= 5:
-            team_approved = False
-            while not team_approved:
-                leader = self.get_leader()
-                team_size = self.get_team_size()
-                # Discussion phase: get team suggestion
-                team = self.discussion_phase(leader, team_size)
-                # Voting phase
-                team_approved = self.vote_on_team(team)
-                curses.wrapper(transition)
-                if not team_approved and self.failed_votes == 5:
-                    print("Five consecutive rejections. Bad team wins.")
-                    self.game_over(False)
-                self.rotate_leader()
-            self.execute_mission(team)
-
-# --- AGENT LOGIC FUNCTIONS ---
-def agent_discussion(agent, team, memory, discussion_history, round_number):
-    # Use LLM for agentic discussion
-    return ollama_agent_message(
-        agent,
-        discussion_history,
-        memory['missions'],
-        memory['votes'],
-        round_number,
-        team
-    )
-
-def agent_vote(agent, team, memory, discussion_history, round_number):
-    return ollama_agent_vote(
-        agent,
-        team,
-        discussion_history,
-        memory['missions'],
-        memory['votes'],
-        round_number
-    )
-
-def agent_mission_action(agent, team, memory, discussion_history, round_number):
-    return ollama_agent_mission_action(
-        agent,
-        team,
-        discussion_history,
-        memory['missions'],
-        memory['votes'],
-        round_number
-    )
+    def start(self, warmup=None):
+        """Reveal the human's role, then play the game; returns self.result.
+
+        warmup (a warmup.Warmup) gets the reveal to finish loading the model;
+        play waits for it after that, so no agent call pays the load.
+        """
+        self.ui.clear()
+        self.ui.pause(2)
+        if self.human is not None:
+            self.ui.say(f"Your codename is {self.human.name}", style='system', delay=0.08)
+            self.ui.pause(2)
+            self.ui.say(f"You are the {self.human.role.name.capitalize()}", style='dramatic', delay=0.12, typewriter=True)
+            self.ui.pause(4)
+        self.ui.clear()
+        with self.trace.span('transition'):
+            self.ui.transition()
+        self.ui.pause(1)
+        if warmup is not None and not warmup.done.is_set():
+            self.ui.say(warmup.describe(), style='system', delay=0.01)
+            with self.trace.span('warmup'):
+                warmup.wait(timeout=warmup.load_timeout, ready=True)
+        if warmup is not None and warmup.failed:
+            self.ui.say(warmup.describe(), style='warning', delay=0.01)
+        return self.play()
+
+    def play(self):
+        """Run rounds until the game ends and return the result dict."""
+        _bind_worker(self.session, self.trace)
+        try:
+            while self.round <= 5:
+                team_approved = False
+                while not team_approved:
+                    leader = self.get_leader()
+                    team_size = self.get_team_size()
+                    # Discussion phase: get team suggestion
+                    with self.trace.span('discussion', round=self.round):
+                        team = self.discussion_phase(leader, team_size)
+                    # Voting phase
+                    with self.trace.span('vote', round=self.round):
+                        team_approved = self.vote_on_team(team)
+                    with self.trace.span('transition'):
+                        self.ui.transition()
+                    if not team_approved and self.failed_votes == 5:
+                        self.ui.say("Five consecutive rejections. Bad team wins.", style='warning', delay=0)
+                        self.game_over(False, 'rejections')
+                    self.rotate_leader()
+                with self.trace.span('mission', round=self.round):
+                    self.execute_mission(team)
+        except GameOver:
+            pass
+        finally:
+            for stale in self._speculative.values():
+                self._cancel_speculation(*stale)
+            self.executor.shutdown(wait=False)
+        return self.result
+
+def _bind_worker(session, trace):
+    # Calls made on this thread count toward this game's session and trace
+    bind_session(session)
+    bind_trace(trace)
+
+def _preload():
+    # Modules the game needs but the menu doesn't; imported while the intro plays
+    import beliefs
+    import requests
 
 if __name__ == '__main__':
-    colors = ['Violet', 'Indigo', 'Blue', 'Green', 'Yellow', 'Orange', 'Red']
-    random.shuffle(colors)
-    game = GameState(colors)
+    import argparse, sys, threading
+    parser = argparse.ArgumentParser(description="Play SECRETS in the terminal.")
+    parser.add_argument('--seed', type=int, help="seed for roles, leaders and agent fallbacks")
+    parser.add_argument('--record', metavar='PATH', help="journal the game to PATH (replay with journal.py)")
+    parser.add_argument('--pacing', choices=sorted(PROFILES), default='cinematic',
+                        help="cosmetic delays between lines; 'fast' removes them and the intro")
+    parser.add_argument('--trace', metavar='PREFIX',
+                        help="write timing to PREFIX.summary.json and a Chrome trace to PREFIX.trace.json")
+    parser.add_argument('--startup-time', action='store_true', help="report the time from launch to the menu")
+    args = parser.parse_args()
+    ui = TerminalUI(pacing=args.pacing)
+    threading.Thread(target=_preload, daemon=True).start()
+    # Loads the model behind the intro and menu
+    from warmup import Warmup
+    warmup = Warmup().start()
+
+    recorder = None
+
+    def new_game():
+        global recorder
+        colors = ['Violet', 'Indigo', 'Blue', 'Green', 'Yellow', 'Orange', 'Red']
+        random.shuffle(colors)
+        if args.record:
+            from journal import Recorder
+            recorder = Recorder(args.record)
+            return recorder.game(colors, seed=args.seed, ui=ui, factory=GameState)
+        return GameState(colors, seed=args.seed, ui=ui)
 
     clear_screen()
-    time.sleep(0.5)
-    curses.wrapper(intro)
-    clear_screen()
-    time.sleep(0.5)
-    
+    if ui.pacer.scale:
+        ui.pause(0.5)
+        SCREEN.run(lambda stdscr: intro(stdscr, ui.pacer.scale))
+        clear_screen()
+        ui.pause(0.5)
+
     def draw_main_menu():
-        f = pyfiglet.Figlet(font='slant')
-        title = f.renderText('SECRETS')
-        print(f"\033[95m{title}\033[0m")
-        styled_print('Fate Awaits', style='dramatic', delay=0.04, typewriter=True)
-        new_line()
-        styled_print('MAIN MENU', style='system', delay=0.04)
-        new_line()
-        styled_print('[R]ules', style='system', delay=0.01)
-        styled_print('[S]tart', style='system', delay=0.01)
-        styled_print('[Q]uit', style='system', delay=0.01)
-        new_line()
-        styled_print('Choose your destiny...', style='dramatic', delay=0.02)
+        with ui.frame():
+            ui.pacer.ready()
+            TERMINAL.write(f"\033[95m{banner('SECRETS')}\033[0m\n")
+            ui.say('Fate Awaits', style='dramatic', delay=0.04, typewriter=True)
+            ui.new_line()
+            ui.say('MAIN MENU', style='system', delay=0.04)
+            ui.new_line()
+            ui.say('[R]ules', style='system', delay=0.01)
+            ui.say('[S]tart', style='system', delay=0.01)
+            ui.say('[Q]uit', style='system', delay=0.01)
+            ui.new_line()
+            ui.say(warmup.describe(), style='warning' if warmup.failed else 'system', delay=0.01)
+            ui.new_line()
+            ui.say('Choose your destiny...', style='dramatic', delay=0.02)
 
     draw_main_menu()
-    choice = input('> ').strip().upper()
+    if args.startup_time:
+        print(f"menu ready {(time.perf_counter() - _LAUNCHED) * 1000:.0f} ms after launch", file=sys.stderr)
+    choice = ui.ask('> ').strip().upper()
     while True:
         if choice == 'R':
-            print_rules()
-            input('Press Enter to return to the menu...')
-            clear_screen()
+            with ui.frame():
+                print_rules(ui)
+            ui.ask('Press Enter to return to the menu...')
+            ui.clear()
             draw_main_menu()
-            choice = input('> ').strip().upper()
+            choice = ui.ask('> ').strip().upper()
         elif choice == 'S':
-            clear_screen()
-            game.start()
+            # Don't seat anyone until the backend has answered
+            warmup.wait()
+            if warmup.failed:
+                ui.say(warmup.describe(), style='warning', delay=0.01)
+                ui.ask('Press Enter to return to the menu...')
+                warmup = Warmup().start()
+                ui.clear()
+                draw_main_menu()
+                choice = ui.ask('> ').strip().upper()
+                continue
+            ui.clear()
+            game = new_game()
+            game.start(warmup)
+            if recorder:
+                recorder.finish(game.result)
+            if args.trace:
+                game.trace.export(args.trace)
             break
         elif choice == 'Q':
-            styled_print('Goodbye!', style='dramatic', delay=0.05)
+            ui.say('Goodbye!', style='dramatic', delay=0.05)
             break
         else:
-            clear_screen()
+            ui.clear()
             draw_main_menu()
-            choice = input('> ').strip().upper()
\ No newline at end of file
+            choice = ui.ask('> ').strip().upper()
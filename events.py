@@ -0,0 +1,142 @@
+"""Append-only game event log.
+
+One shared EventLog holds the public discussion; each player also owns a
+small private EventLog for hidden information (their own votes and mission
+cards). Records are slotted and every stream is a fixed-size ring, so
+memory stays flat however long a session runs. Readers get LogViews, which
+slice by absolute position without copying.
+"""
+
+
+class Event:
+    __slots__ = ('seq', 'kind', 'round', 'speaker', 'text', 'team')
+
+    # Old dict keys per kind, so e['text'], v['vote'] and m['action'] still work
+    _KEYS = {
+        'chat': ('round', 'speaker', 'text'),
+        'vote': ('round', 'team', 'vote'),
+        'mission': ('round', 'team', 'action'),
+    }
+    _ALIASES = {'vote': 'text', 'action': 'text'}
+
+    def __init__(self, seq, kind, round, speaker, text, team=()):
+        self.seq = seq
+        self.kind = kind
+        self.round = round
+        self.speaker = speaker
+        self.text = text
+        self.team = team
+
+    def __getitem__(self, key):
+        return getattr(self, self._ALIASES.get(key, key))
+
+    def as_dict(self):
+        d = {key: self[key] for key in self._KEYS.get(self.kind, ('round', 'speaker', 'text'))}
+        if 'team' in d:
+            d['team'] = list(d['team'])
+        return d
+
+    def __repr__(self):
+        return repr(self.as_dict())
+
+
+class _Ring:
+    __slots__ = ('buf', 'capacity', 'start', 'end')
+
+    def __init__(self, capacity):
+        self.buf = [None] * capacity
+        self.capacity = capacity
+        # Absolute positions: [start, end) is what is still held
+        self.start = 0
+        self.end = 0
+
+    def append(self, item):
+        self.buf[self.end % self.capacity] = item
+        self.end += 1
+        if self.end - self.start > self.capacity:
+            self.start += 1
+
+    def get(self, pos):
+        return self.buf[pos % self.capacity]
+
+
+class LogView:
+    """A read-only window onto one stream of an EventLog.
+
+    Without bounds it is live and follows new appends; slicing returns a
+    fixed window. Positions that have rotated out of the ring are skipped.
+    """
+
+    __slots__ = ('ring', 'lo', 'hi')
+
+    def __init__(self, ring, lo=None, hi=None):
+        self.ring = ring
+        self.lo = lo
+        self.hi = hi
+
+    def _bounds(self):
+        lo = self.ring.start if self.lo is None else max(self.lo, self.ring.start)
+        hi = self.ring.end if self.hi is None else min(self.hi, self.ring.end)
+        return lo, max(lo, hi)
+
+    @property
+    def end(self):
+        """Absolute position just past the newest event; use as a cursor."""
+        return self._bounds()[1]
+
+    def since(self, pos):
+        """Live view of everything from absolute position pos on."""
+        return LogView(self.ring, pos, self.hi)
+
+    def __len__(self):
+        lo, hi = self._bounds()
+        return hi - lo
+
+    def __iter__(self):
+        lo, hi = self._bounds()
+        get = self.ring.get
+        for pos in range(lo, hi):
+            yield get(pos)
+
+    def __getitem__(self, index):
+        lo, hi = self._bounds()
+        if isinstance(index, slice):
+            start, stop, step = index.indices(hi - lo)
+            if step != 1:
+                return list(self)[index]
+            return LogView(self.ring, lo + start, lo + max(start, stop))
+        if index < 0:
+            index += hi - lo
+        if not 0 <= index < hi - lo:
+            raise IndexError("log index out of range")
+        return self.ring.get(lo + index)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class EventLog:
+    """Ring-buffered event streams ('chat', 'vote', 'mission') sharing one sequence."""
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.streams = {}
+        self.seq = 0
+
+    def _ring(self, kind):
+        ring = self.streams.get(kind)
+        if ring is None:
+            ring = self.streams[kind] = _Ring(self.capacity)
+        return ring
+
+    def append(self, kind, round, speaker, text, team=()):
+        event = Event(self.seq, kind, round, speaker, text, tuple(team))
+        self.seq += 1
+        self._ring(kind).append(event)
+        return event
+
+    def view(self, kind):
+        return LogView(self._ring(kind))
@@ -1,67 +1,91 @@
-import os
-import sys
 import time
 import random
-import pyfiglet
+from functools import lru_cache
+from render import TERMINAL
 
 def clear_screen():
-    os.system('cls' if os.name == 'nt' else 'clear')
+    TERMINAL.clear()
 
     
-def print_rules():
-    clear_screen()
-    f = pyfiglet.Figlet(font='slant')
-    title = f.renderText('SECRETS')
-    print(f"\033[95m{title}\033[0m")
-    styled_print('Fate Awaits', style='dramatic', delay=0.04, typewriter=True)
-    new_line()
-    styled_print('GAME RULES', style='system', delay=0.04)
-    new_line()
-    styled_print('- 7 players:    4 \033[92mGood\033[0m (\033[96mWhistleblower\033[0m, \033[96mDetective\033[0m, \033[96mCop\033[0m, \033[96mPresident\033[0m),', style='system', delay=0.01)
-    styled_print('              3 \033[91mConspirators\033[0m (\033[95mDon\033[0m, \033[95mAssassin\033[0m, \033[95mInfiltrator\033[0m).', style='system', delay=0.01)
-    new_line()
-    styled_print('- 5 missions: Rounds 1-3 & 5 require 1 fail to fail; Round 4 requires 2 fails.', style='system', delay=0.01)
-    styled_print('- Leader rotates, proposes a team of size depending on round.', style='system', delay=0.01)
-    styled_print('- All vote Approve/Reject; 5 consecutive rejections ⇒ Conspirators win.', style='system', delay=0.01)
-    styled_print('- Failed mission triggers emergency vote to reveal President.', style='system', delay=0.01)
-    styled_print('- Good wins upon 3 successful missions; Conspirators win upon 3 failures.', style='system', delay=0.01)
-    styled_print('- If Good completes 3 successful missions then Assassin may guess', style='system', delay=0.01)
-    styled_print('    Whistleblower. If done successfully Conspirators win!', style='system', delay=0.01)
-    new_line()
+@lru_cache(maxsize=None)
+def banner(text, font='slant'):
+    """Figlet art for text, rendered once per (text, font) and reused."""
+    # pyfiglet parses its font file on every Figlet(); import it only when a banner is drawn
+    import pyfiglet
+    return pyfiglet.Figlet(font=font).renderText(text)
 
+def print_rules(ui):
+    """Show the rules through ui, so they follow its pacing profile."""
+    ui.clear()
+    title = banner('SECRETS')
+    TERMINAL.write(f"\033[95m{title}\033[0m\n")
+    ui.say('Fate Awaits', style='dramatic', delay=0.04, typewriter=True)
+    ui.new_line()
+    ui.say('GAME RULES', style='system', delay=0.04)
+    ui.new_line()
+    ui.say('- 7 players:    4 \033[92mGood\033[0m (\033[96mWhistleblower\033[0m, \033[96mDetective\033[0m, \033[96mCop\033[0m, \033[96mPresident\033[0m),', style='system', delay=0.01)
+    ui.say('              3 \033[91mConspirators\033[0m (\033[95mDon\033[0m, \033[95mAssassin\033[0m, \033[95mInfiltrator\033[0m).', style='system', delay=0.01)
+    ui.new_line()
+    ui.say('- 5 missions: Rounds 1-3 & 5 require 1 fail to fail; Round 4 requires 2 fails.', style='system', delay=0.01)
+    ui.say('- Leader rotates, proposes a team of size depending on round.', style='system', delay=0.01)
+    ui.say('- All vote Approve/Reject; 5 consecutive rejections ⇒ Conspirators win.', style='system', delay=0.01)
+    ui.say('- Failed mission triggers emergency vote to reveal President.', style='system', delay=0.01)
+    ui.say('- Good wins upon 3 successful missions; Conspirators win upon 3 failures.', style='system', delay=0.01)
+    ui.say('- If Good completes 3 successful missions then Assassin may guess', style='system', delay=0.01)
+    ui.say('    Whistleblower. If done successfully Conspirators win!', style='system', delay=0.01)
+    ui.new_line()
+
+
+STYLE_COLORS = {
+    'system': '\033[92m',   # Green
+    'player': '\033[94m',  # Blue
+    'warning': '\033[93m',  # Yellow
+    'error': '\033[91m',    # Red
+    'dramatic': '\033[95m', # Magenta
+    'reset': '\033[0m'
+}
+
+STYLE_PREFIXES = {
+    'system': '[SYSTEM] ',
+    'player': '[REMOTE] ',
+    'warning': '[!]',
+    'error': '[X]',
+    'dramatic': '[***] '
+}
 
 def styled_print(msg, style='system', delay=0.01, typewriter=False):
-    COLORS = {
-        'system': '\033[92m',   # Green
-        'player': '\033[94m',  # Blue
-        'warning': '\033[93m',  # Yellow
-        'error': '\033[91m',    # Red
-        'dramatic': '\033[95m', # Magenta
-        'reset': '\033[0m'
-    }
-    prefix = {
-        'system': '[SYSTEM] ',
-        'player': '[REMOTE] ',
-        'warning': '[!]',
-        'error': '[X]',
-        'dramatic': '[***] '
-    }.get(style, '')
-    color = COLORS.get(style, COLORS['system'])
-    reset = COLORS['reset']
+    prefix = STYLE_PREFIXES.get(style, '')
+    color = STYLE_COLORS.get(style, STYLE_COLORS['system'])
+    reset = STYLE_COLORS['reset']
     full_msg = f"{color}{prefix}{msg}{reset}"
     if typewriter:
-        for c in full_msg:
-            sys.stdout.write(c)
-            sys.stdout.flush()
-            time.sleep(delay)
-        print()
+        TERMINAL.typewrite(full_msg + "\n", delay)
     else:
-        print(full_msg)
+        TERMINAL.write(full_msg + "\n")
         if delay > 0:
             time.sleep(delay + random.uniform(0, 0.1))
+
+def styled_stream(chunks, style='player', lead='', delay=0.01):
+    """Like styled_print, but writes each chunk of an iterable as soon as it arrives.
+
+    lead is printed straight away (e.g. "Name: ") so the line appears before
+    the first token does. Returns the full text that was shown.
+    """
+    prefix = STYLE_PREFIXES.get(style, '')
+    color = STYLE_COLORS.get(style, STYLE_COLORS['system'])
+    reset = STYLE_COLORS['reset']
+    TERMINAL.write(f"{color}{prefix}{lead}")
+    shown = []
+    for chunk in chunks:
+        TERMINAL.write(chunk)
+        shown.append(chunk)
+    TERMINAL.write(f"{reset}\n")
+    if delay > 0:
+        time.sleep(delay + random.uniform(0, 0.1))
+    return "".join(shown)
             
 def new_line():
-    print()
+    TERMINAL.write("\n")
     
 def _format_beliefs(beliefs_dict):
     """Return a concise human-readable string of Trust / Suspect / Unsure lists."""
@@ -0,0 +1,250 @@
+"""Record a game's LLM traffic and human input, and replay it offline.
+
+A journal is JSONL, one entry per line:
+
+    {"t": "game", "names": [...], "seed": ..., "options": {...}}
+    {"t": "llm", "key": ..., "prompt": ..., "reply": {...}}
+    {"t": "input", "prompt": ..., "answer": ...}
+    {"t": "result", "result": {...}}
+
+Game logic draws from the seeded GameState.rng and agent fallbacks from
+each Player.rng, so the seed plus the recorded replies and answers are
+enough to replay the game exactly, without a model and without any waits:
+
+    python engine.py --record game.jsonl
+    python journal.py game.jsonl --echo
+"""
+import argparse
+import json
+import threading
+from collections import deque
+
+import llm
+from cache import cache_key
+from scheduler import DISCUSSION
+from ui import TerminalUI, HeadlessUI
+
+
+class ReplayMismatch(Exception):
+    """The replayed game asked for something the journal doesn't hold."""
+
+
+def _request_key(prompt, fields, stream, context_id):
+    # Contexts are stored as small ids (see Recorder.compact), so key on the id
+    fields = dict(fields)
+    if fields.get("context"):
+        fields["context"] = context_id(fields["context"])
+    return cache_key("stream" if stream else "generate", prompt, fields)
+
+
+class Recorder:
+    """Writes one game's journal to path as it is played."""
+
+    def __init__(self, path):
+        self.file = open(path, "w")
+        self.lock = threading.Lock()
+        # Model context token lists are long; each distinct one is stored as an id
+        self.contexts = {}
+
+    def write(self, kind, **data):
+        line = json.dumps({"t": kind, **data}, separators=(",", ":"))
+        with self.lock:
+            self.file.write(line + "\n")
+            self.file.flush()
+
+    def context_id(self, context):
+        with self.lock:
+            return self.contexts.setdefault(tuple(context), len(self.contexts) + 1)
+
+    def compact(self, reply):
+        reply = dict(reply)
+        if reply.get("context"):
+            reply["context"] = [self.context_id(reply["context"]), len(reply["context"])]
+        return reply
+
+    def game(self, names, seed=None, ui=None, factory=None, **options):
+        """Start a journaled GameState: LLM calls and human input are recorded from here on.
+
+        factory is the GameState class to build; engine.py passes its own so
+        a game launched as __main__ doesn't load the engine a second time.
+        """
+        if factory is None:
+            from engine import GameState as factory
+        game = factory(names, seed=seed, ui=RecordingUI(ui or TerminalUI(), self), **options)
+        self.write("game", names=list(names), seed=game.seed, options=options, model=llm.get_client().model)
+        llm.use_client(RecordingClient(llm.get_client(), self))
+        return game
+
+    def finish(self, result):
+        self.write("result", result=result)
+        with self.lock:
+            self.file.close()
+
+
+class RecordingClient:
+    """Passes calls through to the real client and journals every reply."""
+
+    def __init__(self, inner, recorder):
+        self.inner = inner
+        self.recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def request(self, prompt, cache=False, priority=DISCUSSION, accept=None, **fields):
+        key = _request_key(prompt, fields, False, self.recorder.context_id)
+        reply = self.inner.request(prompt, cache=cache, priority=priority, accept=accept, **fields)
+        self.recorder.write("llm", key=key, prompt=prompt, reply=self.recorder.compact(reply))
+        return reply
+
+    def generate(self, prompt, cache=False, priority=DISCUSSION, accept=None, **fields):
+        return self.request(prompt, cache=cache, priority=priority, accept=accept, **fields).get("response", "").strip()
+
+    def stream(self, prompt, cache=False, priority=DISCUSSION, **fields):
+        key = _request_key(prompt, fields, True, self.recorder.context_id)
+        pieces = []
+        final = {}
+        try:
+            final = yield from _collect(self.inner.stream(prompt, cache=cache, priority=priority, **fields), pieces)
+        finally:
+            reply = dict(final, response="".join(pieces))
+            self.recorder.write("llm", key=key, prompt=prompt, reply=self.recorder.compact(reply))
+        return final
+
+    def close(self):
+        self.inner.close()
+
+
+def _collect(chunks, pieces):
+    # Re-yield a stream while keeping its pieces; returns the stream's final dict
+    while True:
+        try:
+            piece = next(chunks)
+        except StopIteration as stop:
+            return stop.value or {}
+        pieces.append(piece)
+        yield piece
+
+
+class RecordingUI:
+    """Wraps a UI and journals every answer the human gives."""
+
+    def __init__(self, inner, recorder):
+        self.inner = inner
+        self.recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def ask(self, prompt):
+        answer = self.inner.ask(prompt)
+        self.recorder.write("input", prompt=prompt, answer=answer)
+        return answer
+
+
+class ReplayClient:
+    """Answers LLM calls from a journal instead of the model."""
+
+    model = ""
+
+    def __init__(self, entries):
+        self.lock = threading.Lock()
+        # Concurrent agents finish in any order, so replies are matched by
+        # request, not by position; repeats of a request are served in order
+        self.replies = {}
+        for e in entries:
+            self.replies.setdefault(e["key"], deque()).append(e["reply"])
+
+    def _reply(self, prompt, fields, stream):
+        key = _request_key(prompt, fields, stream, lambda context: context[0])
+        with self.lock:
+            queue = self.replies.get(key)
+            if not queue:
+                raise ReplayMismatch("no recorded reply for prompt: " + prompt[-120:])
+            # The last reply stays put: a speculative call the recording
+            # cancelled before it ran may still ask for it here
+            reply = queue.popleft() if len(queue) > 1 else queue[0]
+        reply = dict(reply)
+        if reply.get("context"):
+            context_id, length = reply["context"]
+            reply["context"] = [context_id] * length
+        return reply
+
+    def request(self, prompt, cache=False, priority=DISCUSSION, accept=None, **fields):
+        return self._reply(prompt, fields, False)
+
+    def generate(self, prompt, cache=False, priority=DISCUSSION, accept=None, **fields):
+        return self.request(prompt, **fields).get("response", "").strip()
+
+    def stream(self, prompt, cache=False, priority=DISCUSSION, **fields):
+        reply = self._reply(prompt, fields, True)
+        # Opens with "" like a live stream does as the call is sent
+        yield ""
+        if reply.get("response"):
+            yield reply["response"]
+        return reply
+
+    def close(self):
+        pass
+
+
+class ReplayUI(HeadlessUI):
+    """Feeds the journaled human answers back in; never waits."""
+
+    def __init__(self, answers, echo=False):
+        self.answers = deque(answers)
+        self.echo = echo
+
+    def say(self, msg, style='system', delay=0.01, typewriter=False):
+        if self.echo:
+            print(msg)
+
+    def say_stream(self, chunks, style='player', lead='', delay=0.01):
+        text = "".join(chunks)
+        if self.echo:
+            print(lead + text)
+        return text
+
+    def ask(self, prompt):
+        if not self.answers:
+            raise ReplayMismatch("no recorded answer for: " + prompt)
+        answer = self.answers.popleft()
+        if self.echo:
+            print(prompt + answer)
+        return answer
+
+
+def load(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def replay(path, echo=False):
+    """Replay a journal; returns (replayed result, recorded result or None)."""
+    entries = load(path)
+    header = next(e for e in entries if e["t"] == "game")
+    recorded = next((e["result"] for e in entries if e["t"] == "result"), None)
+    previous = llm.get_client()
+    llm.use_client(ReplayClient([e for e in entries if e["t"] == "llm"]))
+    try:
+        from engine import GameState
+        ui = ReplayUI([e["answer"] for e in entries if e["t"] == "input"], echo=echo)
+        game = GameState(header["names"], seed=header["seed"], ui=ui, **header["options"])
+        return game.play(), recorded
+    finally:
+        llm.use_client(previous)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded game without the model.")
+    parser.add_argument('journal')
+    parser.add_argument('--echo', action='store_true', help="print the game as it replays")
+    args = parser.parse_args(argv)
+    result, recorded = replay(args.journal, echo=args.echo)
+    print(json.dumps(result, indent=2))
+    if recorded is not None and result != recorded:
+        raise SystemExit("replay diverged from the recorded result")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,271 @@
+import os
+import json
+import threading
+from contextlib import contextmanager
+from cache import ResponseCache, cache_key
+from scheduler import RequestScheduler, Cancelled, DISCUSSION, effective_priority
+
+
+DEFAULT_BASE_URL = os.environ.get("OLLAMA_HOST", "http://localhost:11434")
+DEFAULT_MODEL = os.environ.get("SECRETS_MODEL", "qwen7b")
+# SQLite file for the response cache; unset keeps the cache in memory only
+DEFAULT_CACHE_PATH = os.environ.get("SECRETS_CACHE")
+
+
+def decode_response(r):
+    """Decode an /api/generate reply into a single dict.
+
+    Ollama answers with one JSON object when stream is off, but some builds
+    (and proxies) still send NDJSON. Chunks are merged so 'response' holds the
+    full text and the remaining fields come from the final chunk.
+    """
+    try:
+        obj = r.json()
+        if isinstance(obj, dict):
+            return obj
+    except ValueError:
+        pass
+    merged = {}
+    pieces = []
+    for line in r.text.strip().splitlines():
+        try:
+            obj = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(obj, dict):
+            continue
+        pieces.append(obj.get("response", ""))
+        merged.update(obj)
+    merged["response"] = "".join(pieces)
+    return merged
+
+
+class OllamaClient:
+    """Shared HTTP client for the Ollama backend.
+
+    Holds one requests.Session so every agent call reuses pooled keep-alive
+    connections instead of opening a new socket per request. Calls made with
+    cache=True are answered from the ResponseCache when the same prompt,
+    model and options have been seen before. Every other call goes through
+    the client's RequestScheduler (see scheduler.py).
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, model=DEFAULT_MODEL,
+                 connect_timeout=3.05, read_timeout=30, pool_size=8, keep_alive="10m",
+                 cache=None, max_in_flight=4):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.keep_alive = keep_alive
+        # requests is the slowest import in the game; load it with the first client
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Connection": "keep-alive"})
+        self.cache = cache if cache is not None else ResponseCache(path=DEFAULT_CACHE_PATH)
+        # Caps calls running at the backend and orders the rest by priority
+        self.scheduler = RequestScheduler(max_in_flight=max_in_flight)
+
+    @property
+    def timeout(self):
+        return (self.connect_timeout, self.read_timeout)
+
+    def url(self, path):
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, prompt, cache=False, priority=DISCUSSION, accept=None, **fields):
+        """POST a generate call and return the decoded reply dict.
+
+        The call waits for a scheduler slot at priority. Inside a
+        cancel_scope the reply is streamed and merged instead, so a cancel
+        can drop the connection mid-generation. A reply served from the
+        cache is a copy with cached=True; its timing fields are the
+        original call's. With cache=True, accept(text) can veto storing a
+        reply, so an answer the caller rejects is asked for again next time.
+        """
+        key = cache_key(self.model, prompt, fields) if cache else None
+        if key is not None:
+            reply = self.cache.get(key)
+            if reply is not None:
+                return dict(reply, cached=True)
+        if current_token() is None:
+            session = current_session()
+            started = self.scheduler.acquire(priority, None, session)
+            try:
+                data = {
+                    "model": self.model,
+                    "prompt": prompt,
+                    "stream": False,
+                    "keep_alive": self.keep_alive,
+                }
+                data.update(fields)
+                r = self.session.post(self.url("/api/generate"), json=data, timeout=self.timeout)
+                reply = decode_response(r)
+            finally:
+                self.scheduler.release(started, session, priority=priority)
+        else:
+            pieces = []
+            reply = {}
+            for reply in self._chunks(prompt, priority, fields):
+                pieces.append(reply.get("response", ""))
+            reply = dict(reply, response="".join(pieces))
+        # Errors, empty replies and replies the caller rejects are never worth replaying
+        if key is not None and reply.get("response") and "error" not in reply \
+                and (accept is None or accept(reply["response"])):
+            self.cache.put(key, reply)
+        return reply
+
+    def generate(self, prompt, cache=False, priority=DISCUSSION, accept=None, **fields):
+        """Return only the stripped completion text for prompt."""
+        return self.request(prompt, cache=cache, priority=priority, accept=accept, **fields).get("response", "").strip()
+
+    def stream(self, prompt, cache=False, priority=DISCUSSION, **fields):
+        """Yield completion text as Ollama produces it.
+
+        Reads the NDJSON chunks off the open connection one line at a time.
+        The first piece is always "", yielded as the call is sent, so a
+        caller can show who is speaking before the first token. The
+        generator's return value is the final chunk (done=True), which
+        carries context and timing fields. cache works as for request(): a
+        hit is yielded in one piece and returned with cached=True, and a
+        stream that runs to the end is stored whole.
+        """
+        key = cache_key(self.model, prompt, fields) if cache else None
+        if key is not None:
+            reply = self.cache.get(key)
+            if reply is not None:
+                yield ""
+                if reply.get("response"):
+                    yield reply["response"]
+                return dict(reply, cached=True)
+        final = {}
+        pieces = []
+        chunks = self._chunks(prompt, priority, fields)
+        try:
+            for obj in chunks:
+                piece = obj.get("response", "")
+                if piece or not obj:
+                    yield piece
+                    pieces.append(piece)
+                if obj.get("done"):
+                    final = obj
+        finally:
+            chunks.close()
+        if key is not None and final and "error" not in final and any(pieces):
+            self.cache.put(key, dict(final, response="".join(pieces)))
+        return final
+
+    def _chunks(self, prompt, priority, fields):
+        # One streaming call inside a scheduler slot, yielding parsed chunks.
+        # Cancelling the current token closes the response, which drops the
+        # connection and stops Ollama generating for it.
+        token = current_token()
+        session = current_session()
+        priority = effective_priority(priority, token)
+        started = self.scheduler.acquire(priority, token, session)
+        data = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": True,
+            "keep_alive": self.keep_alive,
+        }
+        data.update(fields)
+        try:
+            # The call has its slot and goes out now; an empty chunk tells stream() so
+            yield {}
+            with self.session.post(self.url("/api/generate"), json=data, timeout=self.timeout, stream=True) as r:
+                remove = token.on_cancel(r.close) if token is not None else None
+                try:
+                    for line in r.iter_lines():
+                        if token is not None and token.cancelled:
+                            break
+                        if not line:
+                            continue
+                        try:
+                            obj = json.loads(line)
+                        except ValueError:
+                            continue
+                        yield obj
+                        if obj.get("done"):
+                            return
+                except Exception:
+                    # Reading a response closed under us fails in assorted ways
+                    if token is None or not token.cancelled:
+                        raise
+                finally:
+                    if remove is not None:
+                        remove()
+        finally:
+            cancelled = token is not None and token.cancelled
+            self.scheduler.release(started, session, cancelled, priority)
+        if cancelled:
+            raise Cancelled()
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+# Which game the calling thread belongs to, for schedulers shared between games
+_local = threading.local()
+
+
+def bind_session(session):
+    """Tag the calling thread's LLM calls as belonging to session."""
+    _local.session = session
+
+
+def current_session():
+    return getattr(_local, 'session', None)
+
+
+@contextmanager
+def cancel_scope(token):
+    """Run the calls made inside the block under token (a scheduler.CancelToken)."""
+    previous = getattr(_local, 'token', None)
+    _local.token = token
+    try:
+        yield token
+    finally:
+        _local.token = previous
+
+
+def current_token():
+    return getattr(_local, 'token', None)
+
+
+def get_client():
+    """Return the process-wide client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OllamaClient()
+    return _client
+
+
+def configure(**kwargs):
+    """Replace the shared client, e.g. configure(model='llama3', read_timeout=60)."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = OllamaClient(**kwargs)
+    return _client
+
+
+def use_client(client):
+    """Install client as the shared client without closing the old one.
+
+    Used to wrap the live client (see journal.py) or stand in for it; client
+    needs request(), generate(), stream() and close().
+    """
+    global _client
+    with _client_lock:
+        _client = client
+    return client
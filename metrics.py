@@ -0,0 +1,187 @@
+"""Where a game's time goes.
+
+Each GameState owns a GameTrace and binds it to its threads (bind_trace),
+so agents.py can record every model call against the right game: prompt
+and output tokens, Ollama's own durations, tokens/s and wall time, plus
+fallback and parse-failure events. Calls answered from the response cache
+are kept apart as cache hits and count toward none of the model totals. GameState wraps each phase in a span.
+
+A trace exports as a JSON summary and as a Chrome trace-event timeline
+(open it in chrome://tracing or https://ui.perfetto.dev).
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+_local = threading.local()
+
+
+def bind_trace(trace):
+    _local.trace = trace
+
+
+def current_trace():
+    return getattr(_local, 'trace', None)
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _seconds(ns):
+    return (ns or 0) / 1e9
+
+
+class GameTrace:
+    def __init__(self, session=None):
+        self.session = session
+        self.origin = time.perf_counter()
+        self.lock = threading.Lock()
+        self.spans = []
+        self.calls = []
+        self.events = []
+        # Small stable ids for the threads seen, for the trace viewer's rows
+        self.threads = {}
+
+    def now(self):
+        return time.perf_counter() - self.origin
+
+    def _tid(self):
+        ident = threading.get_ident()
+        with self.lock:
+            return self.threads.setdefault(ident, len(self.threads))
+
+    @contextmanager
+    def span(self, name, **args):
+        """Time the block as one phase; spans may nest."""
+        start = self.now()
+        tid = self._tid()
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.spans.append({'name': name, 'start': start, 'end': self.now(), 'tid': tid, 'args': args})
+
+    def call(self, kind, player, round_number, prompt, reply, started, first_token=None):
+        """Record one finished model call; started/first_token are perf_counter() readings.
+
+        A reply with cached=True never reached the model, so its copied
+        token counts and durations are recorded as zero.
+        """
+        end = self.now()
+        cached = bool(reply.get('cached'))
+        if cached:
+            reply = {}
+        eval_count = reply.get('eval_count') or 0
+        eval_seconds = _seconds(reply.get('eval_duration'))
+        record = {
+            'kind': kind,
+            'cached': cached,
+            'player': player,
+            'round': round_number,
+            'start': started - self.origin,
+            'end': end,
+            'wall': end - (started - self.origin),
+            'ttft': first_token - started if first_token is not None else None,
+            'prompt_bytes': len(prompt.encode('utf-8')),
+            'prompt_tokens': reply.get('prompt_eval_count') or 0,
+            'output_tokens': eval_count,
+            'prompt_eval_s': _seconds(reply.get('prompt_eval_duration')),
+            'eval_s': eval_seconds,
+            'load_s': _seconds(reply.get('load_duration')),
+            'tokens_per_s': eval_count / eval_seconds if eval_seconds else 0.0,
+            'tid': self._tid(),
+        }
+        with self.lock:
+            self.calls.append(record)
+
+    def event(self, name, **args):
+        """A point-in-time event such as a fallback or a parse failure."""
+        record = {'name': name, 'at': self.now(), 'tid': self._tid(), 'args': args}
+        with self.lock:
+            self.events.append(record)
+
+    def summary(self):
+        with self.lock:
+            calls, spans, events = list(self.calls), list(self.spans), list(self.events)
+        hits = {}
+        for c in calls:
+            if c['cached']:
+                hits[c['kind']] = hits.get(c['kind'], 0) + 1
+        calls = [c for c in calls if not c['cached']]
+        by_kind = {}
+        for c in calls:
+            by_kind.setdefault(c['kind'], []).append(c)
+        phases = {}
+        for s in spans:
+            phases.setdefault(s['name'], []).append(s['end'] - s['start'])
+        counts = {}
+        for e in events:
+            key = e['name'] if 'kind' not in e['args'] else f"{e['name']}:{e['args']['kind']}"
+            counts[key] = counts.get(key, 0) + 1
+
+        def calls_summary(rows):
+            walls = [r['wall'] for r in rows]
+            eval_s = sum(r['eval_s'] for r in rows)
+            output = sum(r['output_tokens'] for r in rows)
+            return {
+                'calls': len(rows),
+                'prompt_tokens': sum(r['prompt_tokens'] for r in rows),
+                'output_tokens': output,
+                'prompt_bytes_mean': sum(r['prompt_bytes'] for r in rows) / len(rows),
+                'wall_total': sum(walls),
+                'wall_p50': percentile(walls, 0.5),
+                'wall_p95': percentile(walls, 0.95),
+                'tokens_per_s': output / eval_s if eval_s else 0.0,
+                'load_s': sum(r['load_s'] for r in rows),
+            }
+
+        return {
+            'session': self.session,
+            'elapsed': self.now(),
+            'calls': calls_summary(calls) if calls else {'calls': 0},
+            'calls_by_kind': {k: calls_summary(v) for k, v in by_kind.items()},
+            # Answered from the response cache, by kind; not in the totals above
+            'cache_hits': hits,
+            'phases': {
+                name: {'count': len(d), 'total': sum(d), 'mean': sum(d) / len(d),
+                       'p50': percentile(d, 0.5), 'p95': percentile(d, 0.95), 'max': max(d)}
+                for name, d in phases.items()
+            },
+            'events': counts,
+        }
+
+    def chrome_trace(self):
+        """The game as Chrome trace events (microsecond timestamps)."""
+        us = 1e6
+        with self.lock:
+            calls, spans, events = list(self.calls), list(self.spans), list(self.events)
+        out = [{'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': f"thread {tid}"}}
+               for tid in sorted(set(self.threads.values()))]
+        for s in spans:
+            out.append({'name': s['name'], 'cat': 'phase', 'ph': 'X', 'pid': 1, 'tid': s['tid'],
+                        'ts': s['start'] * us, 'dur': (s['end'] - s['start']) * us, 'args': s['args']})
+        for c in calls:
+            if c['cached']:
+                out.append({'name': f"{c['kind']} {c['player']} (cached)", 'cat': 'cache', 'ph': 'i', 's': 't',
+                            'pid': 1, 'tid': c['tid'], 'ts': c['start'] * us,
+                            'args': {'round': c['round'], 'prompt_bytes': c['prompt_bytes']}})
+                continue
+            args = {k: v for k, v in c.items() if k not in ('start', 'end', 'tid', 'cached')}
+            out.append({'name': f"{c['kind']} {c['player']}", 'cat': 'llm', 'ph': 'X', 'pid': 1, 'tid': c['tid'],
+                        'ts': c['start'] * us, 'dur': c['wall'] * us, 'args': args})
+        for e in events:
+            out.append({'name': e['name'], 'cat': 'agent', 'ph': 'i', 's': 't', 'pid': 1, 'tid': e['tid'],
+                        'ts': e['at'] * us, 'args': e['args']})
+        return {'traceEvents': out, 'displayTimeUnit': 'ms'}
+
+    def export(self, prefix):
+        """Write prefix.summary.json and prefix.trace.json."""
+        with open(prefix + '.summary.json', 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+        with open(prefix + '.trace.json', 'w') as f:
+            json.dump(self.chrome_trace(), f)
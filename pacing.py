@@ -0,0 +1,54 @@
+import time
+
+# Scale applied to every cosmetic delay; 'fast' drops them all
+PROFILES = {'cinematic': 1.0, 'brisk': 0.5, 'fast': 0.0}
+
+
+class Pacer:
+    """Minimum display cadence that counts time spent elsewhere against it.
+
+    hold(seconds) says the next output should not appear sooner than that
+    from now; ready() is called right before any output and sleeps only for
+    what is left. Anything done in between, such as waiting on the model,
+    uses up the hold instead of adding to it, so a beat costs
+    max(model latency, pacing) rather than their sum.
+    """
+
+    def __init__(self, profile='cinematic'):
+        self.profile = profile
+        self.scale = PROFILES[profile]
+        self.ready_at = 0.0
+        # Totals in seconds: cadence asked for, and the part actually slept
+        self.held = 0.0
+        self.slept = 0.0
+
+    def scaled(self, seconds):
+        return seconds * self.scale
+
+    def hold(self, seconds):
+        if seconds <= 0 or not self.scale:
+            return
+        now = time.monotonic()
+        until = now + seconds * self.scale
+        if until > self.ready_at:
+            self.held += until - max(self.ready_at, now)
+            self.ready_at = until
+
+    def waiting(self):
+        """True if ready() would sleep right now."""
+        return self.ready_at > time.monotonic()
+
+    def ready(self):
+        remaining = self.ready_at - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+            self.slept += remaining
+
+    def stats(self):
+        return {
+            'profile': self.profile,
+            'held': round(self.held, 3),
+            'slept': round(self.slept, 3),
+            # Cadence that was covered by real work instead of sleeping
+            'hidden': round(self.held - self.slept, 3),
+        }
@@ -0,0 +1,75 @@
+from roles import CONSPIRATOR_ROLES
+
+
+class HeuristicPolicy:
+    """Deterministic decisions from beliefs, known roles and the public record.
+
+    Answers in microseconds, so it is the default for votes, mission cards,
+    team suggestions and the assassin's guess; the LLM is kept for table talk.
+    """
+
+    # Good players reject a team whose summed trust falls below this
+    reject_below = 0
+
+    def known_conspirators(self, player):
+        """Players this player knows (or, if a Conspirator, is) on the Conspirator side."""
+        known = [p for role, ps in player.known_roles.items() if role in CONSPIRATOR_ROLES for p in ps]
+        if player.role in CONSPIRATOR_ROLES:
+            known.append(player)
+        return known
+
+    def trust(self, player, other):
+        return player.memory['beliefs'].get(other.name, 0)
+
+    def vote(self, game, player, team):
+        known = self.known_conspirators(player)
+        if player.role in CONSPIRATOR_ROLES:
+            # Back any team that carries a Conspirator, stall the rest
+            return 'Y' if any(p in known for p in team) else 'N'
+        if any(p in known for p in team):
+            return 'N'
+        # A fifth rejection hands the game to the Conspirators
+        if game.failed_votes >= 4 or player in team:
+            return 'Y'
+        score = sum(self.trust(player, p) for p in team if p is not player)
+        return 'Y' if score >= self.reject_below else 'N'
+
+    def mission_action(self, game, player, team):
+        if player.role not in CONSPIRATOR_ROLES:
+            return 'P'
+        fails_needed = game.fails_needed()
+        if fails_needed > 1:
+            return 'F'
+        # One fail is enough: leave it to the first Conspirator this player
+        # knows of on the team, in seat order, to avoid showing extra fails
+        allies = [p for p in game.players if p in team and p in self.known_conspirators(player)]
+        return 'F' if allies[0] is player else 'P'
+
+    def suggest_team(self, game, leader, team_size):
+        known = self.known_conspirators(leader)
+        others = [p for p in game.players if p is not leader]
+        if leader.role in CONSPIRATOR_ROLES:
+            # Take the leader as the team's only Conspirator; fill with whoever looks cleanest
+            others = [p for p in others if p not in known]
+        else:
+            others = [p for p in others if p not in known] + [p for p in others if p in known]
+        # Stable sort keeps seat order among equal trust
+        others.sort(key=lambda p: -self.trust(leader, p))
+        return [leader] + others[:team_size - 1]
+
+    def choose_target(self, game, player, candidates):
+        # The Whistleblower is whoever most often voted down teams carrying a
+        # known Conspirator
+        known = self.known_conspirators(player)
+        known_names = {p.name for p in known}
+        best, best_score = None, None
+        for p in candidates:
+            if p in known:
+                continue
+            score = sum(
+                1 for v in p.memory['votes']
+                if v['vote'] == 'N' and known_names.intersection(v['team'])
+            )
+            if best is None or score > best_score:
+                best, best_score = p, score
+        return best or candidates[0]
@@ -0,0 +1,166 @@
+import threading
+from collections import Counter, deque
+from helpers import _format_beliefs, _format_history
+
+# Hard cap on a full agent prompt, rules block included
+PROMPT_TOKEN_BUDGET = 900
+# Most recent votes/mission cards kept as their own lines; older ones are folded into totals
+SUMMARY_LINES = 6
+# Discussion lines offered to the model at most
+DISCUSSION_LINES = 8
+
+
+def estimate_tokens(text):
+    # ~4 characters per token is close enough for English prose with the Qwen tokenizer
+    return len(text) // 4 + 1
+
+
+def fact(event):
+    """One compact line for a vote or mission event."""
+    team = ",".join(event.team)
+    if event.kind == 'vote':
+        return f"R{event.round} vote on {team}: {'approve' if event.text == 'Y' else 'reject'}"
+    return f"R{event.round} mission {team}: played {'pass' if event.text == 'P' else 'fail'}"
+
+
+def fit_history(history, room):
+    """The newest of the last DISCUSSION_LINES entries that fit in room tokens, oldest first.
+
+    Returns (lines, room left).
+    """
+    lines = []
+    for entry in reversed(list(history[-DISCUSSION_LINES:])):
+        line = _format_history([entry])
+        cost = estimate_tokens(line) + 1
+        if cost > room:
+            break
+        lines.append(line)
+        room -= cost
+    lines.reverse()
+    return lines, room
+
+
+def _folded_line(counts):
+    if not counts:
+        return ""
+    return (f"Earlier: {counts['votes']} votes ({counts['approve']} approve), "
+            f"{counts['missions']} missions ({counts['fail']} fail)")
+
+
+class RecordSummary:
+    """A player's own votes and mission cards, summarized as they happen.
+
+    update() only reads events past its cursors, so the summary is extended,
+    never rebuilt. Old events are folded into running totals.
+    """
+
+    def __init__(self):
+        self.recent = deque()
+        self.folded = Counter()
+        self.cursors = {'vote': 0, 'mission': 0}
+
+    def update(self, missions, votes):
+        new = list(missions.since(self.cursors['mission'])) + list(votes.since(self.cursors['vote']))
+        self.cursors['mission'] = missions.end
+        self.cursors['vote'] = votes.end
+        # Both views come from the player's own log, so seq orders them
+        for event in sorted(new, key=lambda e: e.seq):
+            self.recent.append(event)
+            if len(self.recent) > SUMMARY_LINES:
+                self._fold(self.folded, self.recent.popleft())
+
+    @staticmethod
+    def _fold(counts, event):
+        if event.kind == 'vote':
+            counts['votes'] += 1
+            counts['approve'] += event.text == 'Y'
+        else:
+            counts['missions'] += 1
+            counts['fail'] += event.text == 'F'
+
+    def text(self, max_tokens):
+        """Render within max_tokens, folding more of the oldest lines if needed."""
+        counts = Counter(self.folded)
+        recent = list(self.recent)
+        while True:
+            lines = [_folded_line(counts)] + [fact(e) for e in recent]
+            text = "; ".join(line for line in lines if line) or "nothing yet"
+            if estimate_tokens(text) <= max_tokens or not recent:
+                return text if estimate_tokens(text) <= max_tokens else ""
+            self._fold(counts, recent.pop(0))
+
+
+class PromptBuilder:
+    """Builds an agent's full prompt under a hard token budget.
+
+    The rules block and the question are fixed costs; what's left goes to
+    beliefs, the vote/mission summary and as much recent discussion as fits,
+    newest first. Belief text is cached until the belief matrix changes.
+    """
+
+    def __init__(self, player, rules, budget=PROMPT_TOKEN_BUDGET):
+        self.player = player
+        self.rules = rules
+        self.budget = budget
+        self.summary = RecordSummary()
+        self._beliefs_key = None
+        self._beliefs_text = ""
+
+    def beliefs_text(self):
+        beliefs = self.player.memory['beliefs']
+        matrix = getattr(beliefs, 'matrix', None)
+        key = (id(matrix), matrix.version) if matrix is not None else None
+        if key is None or key != self._beliefs_key:
+            self._beliefs_text = _format_beliefs(beliefs)
+            self._beliefs_key = key
+        return self._beliefs_text
+
+    def build(self, situation, team_line, history, missions, votes, question):
+        self.summary.update(missions, votes)
+        head = (
+            self.rules + "\n"
+            f"You are {self.player.name}. {situation}\n"
+            f"{team_line}\n"
+            f"Your private beliefs: {self.beliefs_text()}\n"
+        )
+        tail = "\n\n" + question
+        room = self.budget - estimate_tokens(head) - estimate_tokens(tail)
+        record = "Your record: " + self.summary.text(max(room // 3, 0)) + "\n"
+        room -= estimate_tokens(record)
+        lines, _ = fit_history(history, room)
+        return head + record + "Recent discussion:\n" + "\n".join(lines) + tail
+
+
+class PromptStats:
+    """Size of every prompt sent, so growth over a game is visible."""
+
+    def __init__(self, keep=2000):
+        self.lock = threading.Lock()
+        self.calls = deque(maxlen=keep)
+
+    def record(self, kind, round_number, prompt, full):
+        with self.lock:
+            self.calls.append({
+                'kind': kind, 'round': round_number, 'full': full,
+                'chars': len(prompt), 'tokens': estimate_tokens(prompt),
+            })
+
+    def report(self):
+        """Per-kind and per-round prompt sizes (estimated tokens)."""
+        with self.lock:
+            calls = list(self.calls)
+        def agg(rows):
+            tokens = [r['tokens'] for r in rows]
+            return {'calls': len(rows), 'mean_tokens': sum(tokens) / len(tokens), 'max_tokens': max(tokens)}
+        by_kind, by_round = {}, {}
+        for r in calls:
+            by_kind.setdefault(r['kind'], []).append(r)
+            by_round.setdefault(r['round'], []).append(r)
+        return {
+            'calls': len(calls),
+            'by_kind': {k: agg(v) for k, v in by_kind.items()},
+            'by_round': {k: agg(v) for k, v in sorted(by_round.items())},
+        }
+
+
+PROMPT_STATS = PromptStats()
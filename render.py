@@ -0,0 +1,137 @@
+"""Buffered terminal output.
+
+Everything the game prints goes through TERMINAL, which collects writes
+into frames and hands each frame to the terminal in one write + flush.
+Typewriter effects run on a clock and emit whatever characters are due per
+frame, with ANSI escapes kept whole, instead of flushing and sleeping once
+per byte. Full-screen curses scenes share one screen (SCREEN).
+"""
+import os
+import re
+import sys
+import time
+from contextlib import contextmanager
+
+# Upper bound on typewriter redraws per second
+FRAME_RATE = 60
+
+CLEAR = "\033[2J\033[H"
+_ESCAPE = re.compile(r"\033\[[0-9;?]*[A-Za-z]")
+
+
+def _units(text):
+    """Split text into characters, keeping each ANSI escape sequence as one unit."""
+    units = []
+    pos = 0
+    for m in _ESCAPE.finditer(text):
+        units.extend(text[pos:m.start()])
+        units.append(m.group())
+        pos = m.end()
+    units.extend(text[pos:])
+    return units
+
+
+class Renderer:
+    def __init__(self, stream=None):
+        # None follows sys.stdout, so redirected output is honoured
+        self.stream = stream
+        self.buffer = []
+        self.depth = 0
+
+    @property
+    def out(self):
+        return self.stream or sys.stdout
+
+    def write(self, text):
+        self.buffer.append(text)
+        if not self.depth:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.out.write("".join(self.buffer))
+            self.buffer.clear()
+        self.out.flush()
+
+    @contextmanager
+    def frame(self):
+        """Hold every write made inside the block and show them together.
+
+        An explicit flush() inside the block shows what has been held so
+        far; TerminalUI does that before each paced pause and each prompt,
+        so a frame joins up the writes between beats without delaying any.
+        """
+        self.depth += 1
+        try:
+            yield self
+        finally:
+            self.depth -= 1
+            if not self.depth:
+                self.flush()
+
+    def clear(self):
+        if os.name == 'nt':
+            # Older Windows consoles don't understand the escape sequence
+            self.flush()
+            os.system('cls')
+        else:
+            self.write(CLEAR)
+
+    def typewrite(self, text, delay):
+        """Reveal text one visible character per delay seconds, a frame at a time.
+
+        Each step is flushed even inside frame(), along with whatever the
+        frame held before it.
+        """
+        units = _units(text)
+        if delay <= 0:
+            self.write(text)
+            return
+        start = time.monotonic()
+        shown = 0
+        i = 0
+        while i < len(units):
+            due = int((time.monotonic() - start) / delay) + 1
+            chunk = []
+            while i < len(units) and (shown < due or units[i][0] == "\033"):
+                if units[i][0] != "\033":
+                    shown += 1
+                chunk.append(units[i])
+                i += 1
+            self.write("".join(chunk))
+            self.flush()
+            if i < len(units):
+                next_due = start + shown * delay
+                time.sleep(max(1 / FRAME_RATE, next_due - time.monotonic()))
+
+
+class Screen:
+    """One curses screen reused by every full-screen scene.
+
+    curses.wrapper sets up and tears down a whole screen on each call; here
+    the screen is created once and scenes just resume it, handing the
+    terminal back to normal output (endwin) when each one finishes.
+    """
+
+    def __init__(self):
+        self.stdscr = None
+
+    def run(self, scene):
+        # curses is only needed once a scene is shown; keep it out of startup
+        import curses
+        TERMINAL.flush()
+        if self.stdscr is None:
+            self.stdscr = curses.initscr()
+            curses.noecho()
+            curses.cbreak()
+            self.stdscr.keypad(True)
+        else:
+            self.stdscr.refresh()
+        try:
+            return scene(self.stdscr)
+        finally:
+            curses.endwin()
+
+
+TERMINAL = Renderer()
+SCREEN = Screen()
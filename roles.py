@@ -0,0 +1,12 @@
+from enum import Enum, auto
+
+class Role(Enum):
+    WHISTLEBLOWER = auto()
+    DETECTIVE = auto()
+    COP = auto()
+    PRESIDENT = auto()
+    DON = auto()
+    ASSASSIN = auto()
+    INFILTRATOR = auto()
+
+CONSPIRATOR_ROLES = frozenset({Role.DON, Role.ASSASSIN, Role.INFILTRATOR})
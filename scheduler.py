@@ -0,0 +1,181 @@
+"""Admission control for model calls.
+
+Every call to the backend takes a slot from the client's RequestScheduler.
+At most max_in_flight calls run at once. Waiting calls are served by
+priority class first (decisions ahead of table talk, speculative work
+last), then round-robin across sessions (games) within a class, so one
+busy table can't starve another.
+
+Callers that may stop caring about a result run it under a CancelToken
+(see llm.cancel_scope). Cancelling drops the call from the queue, or, if
+it is already running, closes its connection so the model stops generating.
+"""
+import threading
+import time
+from collections import deque
+
+# Priority classes, lowest served first
+DECISION = 0
+DISCUSSION = 1
+SPECULATIVE = 2
+PRIORITY_NAMES = {DECISION: 'decision', DISCUSSION: 'discussion', SPECULATIVE: 'speculative'}
+
+
+class Cancelled(Exception):
+    """The call's CancelToken was cancelled before it finished."""
+
+
+class Overloaded(Exception):
+    """The queue is full and the call was optional, so it was shed."""
+
+
+class CancelToken:
+    """Marks work whose result may stop being needed.
+
+    priority demotes every call made under the token (e.g. SPECULATIVE).
+    """
+
+    def __init__(self, priority=DECISION):
+        self.priority = priority
+        self.lock = threading.Lock()
+        self.cancelled = False
+        self.callbacks = []
+
+    def cancel(self):
+        with self.lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def on_cancel(self, callback):
+        """Run callback on cancel (now, if already cancelled); returns a remover."""
+        with self.lock:
+            if not self.cancelled:
+                self.callbacks.append(callback)
+                return lambda: self._remove(callback)
+        callback()
+        return lambda: None
+
+    def _remove(self, callback):
+        with self.lock:
+            if callback in self.callbacks:
+                self.callbacks.remove(callback)
+
+
+def effective_priority(priority, token):
+    return max(priority, token.priority) if token is not None else priority
+
+
+class RequestScheduler:
+    def __init__(self, max_in_flight=4, max_pending=32):
+        self.max_in_flight = max_in_flight
+        # Past this many queued calls, SPECULATIVE ones are shed instead of queued;
+        # everything else waits, which holds its caller back
+        self.max_pending = max_pending
+        self.cond = threading.Condition()
+        self.in_flight = 0
+        self.pending = 0
+        # priority -> {session: deque of tickets}, and the round-robin order of sessions
+        self.waiting = {}
+        self.turns = {}
+        self.counts = {name: dict.fromkeys(('calls', 'cancelled', 'shed'), 0) for name in PRIORITY_NAMES.values()}
+        self.waited = dict.fromkeys(PRIORITY_NAMES.values(), 0.0)
+        self.sessions = {}
+
+    def _head(self):
+        for priority in sorted(self.turns):
+            turn = self.turns[priority]
+            if turn:
+                return self.waiting[priority][turn[0]][0]
+        return None
+
+    def _dequeue(self, priority, session, ticket, served):
+        queue = self.waiting[priority][session]
+        turn = self.turns[priority]
+        queue.remove(ticket)
+        if served:
+            # This session goes to the back of the line if it has more waiting
+            turn.remove(session)
+            if queue:
+                turn.append(session)
+        elif not queue:
+            turn.remove(session)
+        if not queue:
+            del self.waiting[priority][session]
+        self.pending -= 1
+
+    def acquire(self, priority=DISCUSSION, token=None, session=None):
+        """Wait for a slot; returns the start time to hand back to release().
+
+        Raises Cancelled if token is cancelled while waiting, and Overloaded
+        if a SPECULATIVE call finds the queue full.
+        """
+        priority = effective_priority(priority, token)
+        name = PRIORITY_NAMES[priority]
+        ticket = object()
+        queued = time.monotonic()
+        with self.cond:
+            if priority == SPECULATIVE and self.pending >= self.max_pending:
+                self.counts[name]['shed'] += 1
+                raise Overloaded("request queue full")
+            self.waiting.setdefault(priority, {}).setdefault(session, deque()).append(ticket)
+            turn = self.turns.setdefault(priority, deque())
+            if session not in turn:
+                turn.append(session)
+            self.pending += 1
+        remove = token.on_cancel(self._wake) if token is not None else None
+        try:
+            with self.cond:
+                while True:
+                    if token is not None and token.cancelled:
+                        self._dequeue(priority, session, ticket, served=False)
+                        self.counts[name]['cancelled'] += 1
+                        self.cond.notify_all()
+                        raise Cancelled()
+                    if self.in_flight < self.max_in_flight and self._head() is ticket:
+                        break
+                    self.cond.wait()
+                self._dequeue(priority, session, ticket, served=True)
+                self.in_flight += 1
+                waited = time.monotonic() - queued
+                self.counts[name]['calls'] += 1
+                self.waited[name] += waited
+                row = self._session(session)
+                row['calls'] += 1
+                row['queued'] += waited
+                # Another slot may still be free for whoever is next
+                self.cond.notify_all()
+        finally:
+            if remove is not None:
+                remove()
+        return time.monotonic()
+
+    def release(self, started, session=None, cancelled=False, priority=DISCUSSION):
+        with self.cond:
+            self.in_flight -= 1
+            self._session(session)['busy'] += time.monotonic() - started
+            if cancelled:
+                self.counts[PRIORITY_NAMES[priority]]['cancelled'] += 1
+            self.cond.notify_all()
+
+    def _wake(self):
+        with self.cond:
+            self.cond.notify_all()
+
+    def _session(self, session):
+        return self.sessions.setdefault(session, {'calls': 0, 'queued': 0.0, 'busy': 0.0})
+
+    def report(self):
+        with self.cond:
+            return {
+                'in_flight': self.in_flight,
+                'pending': self.pending,
+                'by_priority': {
+                    name: dict(row, mean_wait=self.waited[name] / row['calls'] if row['calls'] else 0.0)
+                    for name, row in self.counts.items()
+                },
+                'sessions': {s: dict(row) for s, row in self.sessions.items()},
+            }
@@ -0,0 +1,185 @@
+"""Host many tables at once over a line-based TCP protocol.
+
+    python server.py --port 7777 --slots 4
+    nc localhost 7777            # play; one connection is one game
+    echo STATS | nc localhost 7777
+
+Every connection gets its own GameState on its own thread, so one player
+typing never holds up another table. All games share the process-wide LLM
+client, whose RequestScheduler lets at most `slots` calls reach the backend
+at once and grants waiting calls round-robin across games (within each
+priority class), so a chatty table cannot starve a quiet one.
+"""
+import argparse
+import itertools
+import json
+import random
+import socketserver
+import threading
+import time
+from contextlib import nullcontext
+
+import llm
+from engine import GameState
+from helpers import STYLE_PREFIXES
+from pacing import Pacer, PROFILES
+
+
+class SocketUI:
+    """GameState UI over one connection: lines out, lines in."""
+
+    interactive = True
+
+    def __init__(self, rfile, wfile, pacing='fast'):
+        self.rfile = rfile
+        self.wfile = wfile
+        self.pacer = Pacer(pacing)
+
+    def _send(self, text):
+        self.wfile.write(text.encode('utf-8'))
+        self.wfile.flush()
+
+    def say(self, msg, style='system', delay=0.01, typewriter=False):
+        self.pacer.ready()
+        self._send(f"{STYLE_PREFIXES.get(style, '')}{msg}\n")
+        if delay > 0:
+            self.pacer.hold(delay)
+
+    def say_stream(self, chunks, style='player', lead='', delay=0.01):
+        chunks = iter(chunks)
+        first = next(chunks, "")
+        self.pacer.ready()
+        self._send(f"{STYLE_PREFIXES.get(style, '')}{lead}{first}")
+        shown = [first]
+        for chunk in chunks:
+            if chunk:
+                self._send(chunk)
+                shown.append(chunk)
+        self._send("\n")
+        if delay > 0:
+            self.pacer.hold(delay)
+        return "".join(shown)
+
+    def ask(self, prompt):
+        self.pacer.ready()
+        self._send(prompt)
+        line = self.rfile.readline()
+        if not line:
+            raise ConnectionError("player disconnected")
+        return line.decode('utf-8', 'replace').rstrip("\r\n")
+
+    def new_line(self):
+        self.pacer.ready()
+        self._send("\n")
+
+    def clear(self):
+        self.new_line()
+
+    def pause(self, seconds):
+        self.pacer.hold(seconds)
+
+    def transition(self):
+        self.ask("-- Press Enter to continue --\n")
+
+    def frame(self):
+        # Every line is already its own write to the socket
+        return nullcontext()
+
+    def flush(self):
+        pass
+
+
+class GameServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, slots=4, pacing='fast', game_options=None):
+        super().__init__(address, SessionHandler)
+        self.scheduler = llm.get_client().scheduler
+        self.scheduler.max_in_flight = slots
+        self.pacing = pacing
+        self.game_options = game_options or {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        # session -> {'state', 'rounds', 'seconds', 'result'}
+        self.sessions = {}
+
+    def update(self, session, **fields):
+        with self.lock:
+            self.sessions.setdefault(session, {}).update(fields)
+
+    def stats(self):
+        """Per-session and aggregate throughput."""
+        calls = self.scheduler.report()['sessions']
+        with self.lock:
+            sessions = {s: dict(row, **calls.get(s, {})) for s, row in self.sessions.items()}
+        uptime = time.monotonic() - self.started
+        total_calls = sum(row.get('calls', 0) for row in sessions.values())
+        finished = [row for row in sessions.values() if row['state'] == 'finished']
+        return {
+            'uptime': round(uptime, 3),
+            'active': sum(1 for row in sessions.values() if row['state'] == 'playing'),
+            'games_finished': len(finished),
+            'games_per_min': len(finished) / uptime * 60 if uptime else 0.0,
+            'llm_calls': total_calls,
+            'llm_calls_per_s': total_calls / uptime if uptime else 0.0,
+            'mean_queue_wait': (sum(row.get('queued', 0.0) for row in sessions.values()) / total_calls
+                                if total_calls else 0.0),
+            'sessions': sessions,
+        }
+
+
+class SessionHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server = self.server
+        self.wfile.write(b"SECRETS table server. Press Enter to play, or send STATS.\n")
+        command = self.rfile.readline().decode('utf-8', 'replace').strip().upper()
+        if command == 'STATS':
+            self.wfile.write((json.dumps(server.stats(), indent=2) + "\n").encode('utf-8'))
+            return
+        session = f"table-{next(server.ids)}"
+        names = ['Violet', 'Indigo', 'Blue', 'Green', 'Yellow', 'Orange', 'Red']
+        random.shuffle(names)
+        ui = SocketUI(self.rfile, self.wfile, pacing=server.pacing)
+        game = GameState(names, ui=ui, session=session, **server.game_options)
+        server.update(session, state='playing', rounds=0, seconds=0.0, result=None)
+        t0 = time.monotonic()
+        state, result = 'disconnected', None
+        try:
+            ui.say(f"Seated at {session}.")
+            result = game.start()
+            state = 'finished'
+            ui.say(json.dumps(result))
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            server.update(session, state=state, result=result, rounds=game.round,
+                          seconds=round(time.monotonic() - t0, 3))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host many SECRETS tables over TCP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7777)
+    parser.add_argument('--slots', type=int, default=4, help="concurrent calls allowed to the model backend")
+    parser.add_argument('--pacing', choices=sorted(PROFILES), default='fast')
+    parser.add_argument('--llm-decisions', action='store_true', help="let the model vote and play mission cards too")
+    args = parser.parse_args(argv)
+    options = {'llm_decisions': ('vote', 'mission_action')} if args.llm_decisions else {}
+    # One pooled keep-alive connection per slot; a smaller pool would drop
+    # the extra connections after each call and reconnect
+    llm.configure(pool_size=args.slots, max_in_flight=args.slots)
+    server = GameServer((args.host, args.port), slots=args.slots, pacing=args.pacing, game_options=options)
+    print(f"Serving tables on {args.host}:{args.port} ({args.slots} model slots)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
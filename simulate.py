@@ -0,0 +1,106 @@
+"""Headless batch runner: plays many seeded games and reports win rates.
+
+    python simulate.py --games 5000 --workers 8 --seed 1 --out results.json
+    python simulate.py --games 5000 --players 10
+    python simulate.py --games 5000 --controller random
+
+--controller random seats coin-flip players (controllers.RandomController)
+everywhere instead of the heuristic policy, as a baseline for balance.
+"""
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from controllers import PolicyController, RandomController
+from engine import GameState
+from tables import TABLES
+
+ALL_NAMES = ['Violet', 'Indigo', 'Blue', 'Green', 'Yellow', 'Orange', 'Red', 'Pink', 'Teal', 'Gold']
+DEFAULT_NAMES = ALL_NAMES[:7]
+CONTROLLERS = {'policy': PolicyController, 'random': RandomController}
+
+
+def play_one(seed, names=DEFAULT_NAMES, controller='policy'):
+    """Play one headless game and return its result dict."""
+    controllers = {name: CONTROLLERS[controller]() for name in names}
+    game = GameState(list(names), seed=seed, headless=True, controllers=controllers)
+    return game.play()
+
+
+def play_batch(seeds, names=DEFAULT_NAMES, controller='policy'):
+    # One task per chunk of seeds keeps pickling overhead off the hot path
+    return [play_one(seed, names, controller) for seed in seeds]
+
+
+def aggregate(results):
+    """Fold per-game results into win rates per side, role and seat."""
+    games = len(results)
+    good_wins = sum(1 for r in results if r['good_won'])
+    role_games, role_wins = Counter(), Counter()
+    seat_games, seat_wins = Counter(), Counter()
+    for r in results:
+        for seat, s in enumerate(r['seats']):
+            role_games[s['role']] += 1
+            seat_games[seat] += 1
+            if s['won']:
+                role_wins[s['role']] += 1
+                seat_wins[seat] += 1
+    return {
+        'games': games,
+        'good_win_rate': good_wins / games if games else 0.0,
+        'reasons': dict(Counter(r['reason'] for r in results)),
+        'mean_rounds': sum(r['rounds'] for r in results) / games if games else 0.0,
+        'role_win_rate': {role: role_wins[role] / n for role, n in sorted(role_games.items())},
+        'seat_win_rate': {seat: seat_wins[seat] / n for seat, n in sorted(seat_games.items())},
+    }
+
+
+def run(games, seed=0, workers=None, chunk=100, names=DEFAULT_NAMES, controller='policy'):
+    """Play games seeded seed..seed+games-1 across a process pool."""
+    seeds = list(range(seed, seed + games))
+    chunks = [seeds[i:i + chunk] for i in range(0, len(seeds), chunk)]
+    results = []
+    if workers == 1:
+        for c in chunks:
+            results.extend(play_batch(c, names, controller))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for batch in pool.map(play_batch, chunks, [names] * len(chunks), [controller] * len(chunks)):
+                results.extend(batch)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play seeded headless games and report win rates.")
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first game; game i uses seed+i")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="processes (1 runs in-process)")
+    parser.add_argument('--chunk', type=int, default=100, help="games per task sent to a worker")
+    parser.add_argument('--players', type=int, default=len(DEFAULT_NAMES), choices=sorted(TABLES),
+                        metavar='N', help=f"table size, {min(TABLES)}-{max(TABLES)}")
+    parser.add_argument('--controller', choices=sorted(CONTROLLERS), default='policy',
+                        help="who sits at every seat: the heuristic policy or coin-flip players")
+    parser.add_argument('--out', help="write the summary JSON here")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    names = ALL_NAMES[:args.players]
+    results = run(args.games, seed=args.seed, workers=args.workers, chunk=args.chunk, names=names,
+                  controller=args.controller)
+    summary = aggregate(results)
+    summary['players'] = args.players
+    summary['controller'] = args.controller
+    summary['seed'] = args.seed
+    summary['seconds'] = round(time.perf_counter() - t0, 3)
+    text = json.dumps(summary, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
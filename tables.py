@@ -0,0 +1,23 @@
+from collections import namedtuple
+from roles import Role
+
+# roles: one per seat, Good first; mission_sizes: team size per round;
+# double_fail_rounds: rounds that need two Fail cards to fail
+TableConfig = namedtuple('TableConfig', ['roles', 'mission_sizes', 'double_fail_rounds'])
+
+_GOOD = (Role.WHISTLEBLOWER, Role.DETECTIVE, Role.COP, Role.PRESIDENT)
+_CONSPIRATORS = (Role.DON, Role.ASSASSIN, Role.INFILTRATOR)
+
+TABLES = {
+    5: TableConfig(_GOOD[:3] + _CONSPIRATORS[:2], (2, 3, 2, 3, 3), ()),
+    6: TableConfig(_GOOD + _CONSPIRATORS[:2], (2, 3, 4, 3, 4), ()),
+    7: TableConfig(_GOOD + _CONSPIRATORS, (3, 4, 4, 5, 5), (4,)),
+    8: TableConfig(_GOOD + (Role.COP,) + _CONSPIRATORS, (3, 4, 4, 5, 5), (4,)),
+    9: TableConfig(_GOOD + (Role.COP, Role.PRESIDENT) + _CONSPIRATORS, (3, 4, 4, 5, 5), (4,)),
+    10: TableConfig(_GOOD + (Role.COP, Role.PRESIDENT) + _CONSPIRATORS + (Role.INFILTRATOR,), (3, 4, 4, 5, 5), (4,)),
+}
+
+def table_config(player_count):
+    if player_count not in TABLES:
+        raise ValueError(f"Tables of {min(TABLES)}-{max(TABLES)} players are supported, got {player_count}")
+    return TABLES[player_count]
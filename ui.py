@@ -0,0 +1,113 @@
+import random
+import itertools
+from contextlib import nullcontext
+from helpers import styled_print, styled_stream, new_line, clear_screen
+from aesthetics import transition
+from pacing import Pacer
+from render import SCREEN, TERMINAL
+
+
+class TerminalUI:
+    """Everything GameState shows or asks goes through here.
+
+    Delays are pacing, not sleeps: each output waits on the Pacer, so time
+    the game spends waiting on the model counts toward the next beat.
+    pacing picks a profile from pacing.PROFILES ('fast' has no delays).
+    """
+
+    interactive = True
+
+    def __init__(self, pacing='cinematic'):
+        self.pacer = Pacer(pacing)
+
+    def _beat(self, delay):
+        # Same jitter styled_print used to add after a line
+        if delay > 0:
+            self.pacer.hold(delay + random.uniform(0, 0.1))
+
+    def _ready(self):
+        # Inside a TERMINAL.frame(), what has been written so far goes out
+        # before a pause, not after it
+        if self.pacer.waiting():
+            TERMINAL.flush()
+        self.pacer.ready()
+
+    def say(self, msg, style='system', delay=0.01, typewriter=False):
+        self._ready()
+        if typewriter:
+            styled_print(msg, style=style, delay=self.pacer.scaled(delay), typewriter=True)
+        else:
+            styled_print(msg, style=style, delay=0)
+            self._beat(delay)
+
+    def say_stream(self, chunks, style='player', lead='', delay=0.01):
+        # Pull the first piece before showing the line: streams from the
+        # model open with an empty one as soon as the call is sent, so the
+        # lead goes up then, and queueing runs down the pending beat
+        chunks = iter(chunks)
+        first = next(chunks, "")
+        self._ready()
+        text = styled_stream(itertools.chain([first], chunks), style=style, lead=lead, delay=0)
+        self._beat(delay)
+        return text
+
+    def ask(self, prompt):
+        self._ready()
+        TERMINAL.flush()
+        return input(prompt)
+
+    def new_line(self):
+        self._ready()
+        new_line()
+
+    def clear(self):
+        self._ready()
+        clear_screen()
+
+    def pause(self, seconds):
+        self.pacer.hold(seconds)
+
+    def transition(self):
+        self._ready()
+        SCREEN.run(transition)
+
+    def frame(self):
+        """Lines said inside the block reach the terminal as one write (Renderer.frame)."""
+        return TERMINAL.frame()
+
+    def flush(self):
+        """Show what the current frame holds so far."""
+        TERMINAL.flush()
+
+
+class HeadlessUI:
+    """No terminal, no waits: used for simulations and batch runs."""
+
+    interactive = False
+
+    def say(self, msg, style='system', delay=0.01, typewriter=False):
+        pass
+
+    def say_stream(self, chunks, style='player', lead='', delay=0.01):
+        return "".join(chunks)
+
+    def ask(self, prompt):
+        raise RuntimeError("HeadlessUI cannot ask for input: " + prompt)
+
+    def new_line(self):
+        pass
+
+    def clear(self):
+        pass
+
+    def pause(self, seconds):
+        pass
+
+    def transition(self):
+        pass
+
+    def frame(self):
+        return nullcontext()
+
+    def flush(self):
+        pass
@@ -0,0 +1,122 @@
+"""Get the model ready while the intro and menu are on screen.
+
+Ollama loads a model on its first request, which otherwise lands in the
+middle of the first discussion. Warmup runs on a background thread from
+launch: it checks the backend is up and has the model, loads it with the
+client's keep_alive, and runs the shared rules block through it once so
+agents' prompts, which all start with that block, find it already
+evaluated. The menu reports progress; before a game starts the engine
+checks the backend answered, so a down server is a clear message rather
+than every agent call timing out.
+"""
+import threading
+import time
+
+import llm
+
+
+class Warmup:
+    # idle -> checking -> loading -> priming -> ready; or down / missing / failed
+    FAILED = ('down', 'missing', 'failed')
+
+    def __init__(self, load_timeout=120):
+        # Loading a 7B model from disk can take far longer than a normal read timeout
+        self.load_timeout = load_timeout
+        self.lock = threading.Lock()
+        self.state = 'idle'
+        self.error = None
+        self.model = None
+        self.times = {}
+        # Set once the backend has answered (or failed to); done once warm-up ends
+        self.checked = threading.Event()
+        self.done = threading.Event()
+        self.started = None
+
+    def start(self):
+        self.started = time.perf_counter()
+        threading.Thread(target=self.run, daemon=True).start()
+        return self
+
+    def _set(self, state, error=None):
+        with self.lock:
+            self.state = state
+            self.error = error
+
+    def _timed(self, step, fn):
+        t0 = time.perf_counter()
+        result = fn()
+        self.times[step] = time.perf_counter() - t0
+        return result
+
+    def _generate(self, client, prompt, **fields):
+        data = {"model": client.model, "prompt": prompt, "stream": False, "keep_alive": client.keep_alive}
+        data.update(fields)
+        r = client.session.post(client.url("/api/generate"), json=data,
+                                timeout=(client.connect_timeout, self.load_timeout))
+        reply = llm.decode_response(r)
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply
+
+    def run(self):
+        try:
+            client = llm.get_client()
+            self.model = client.model
+            self._set('checking')
+            try:
+                r = self._timed('check', lambda: client.session.get(client.url("/api/tags"), timeout=client.timeout))
+                installed = {m.get("name") for m in r.json().get("models", [])}
+            except Exception as e:
+                self._set('down', f"Can't reach the model server at {client.base_url} ({type(e).__name__}). "
+                                  "Start it with `ollama serve`, or point OLLAMA_HOST at it.")
+                return
+            if installed and not {client.model, client.model + ":latest"} & installed:
+                self._set('missing', f"Model '{client.model}' isn't installed on {client.base_url}. "
+                                     f"Run `ollama pull {client.model}`, or set SECRETS_MODEL.")
+                return
+            self.checked.set()
+            self._set('loading')
+            # An empty prompt just loads the model and starts its keep_alive clock
+            reply = self._timed('load', lambda: self._generate(client, ""))
+            self.times['load_reported'] = reply.get("load_duration", 0) / 1e9
+            self._set('priming')
+            # Imported here: agents pulls in the rest of the game, which the menu doesn't need
+            from agents import AGENT_RULES_CONTEXT
+            self._timed('prime', lambda: self._generate(client, AGENT_RULES_CONTEXT, options={"num_predict": 1}))
+            self._set('ready')
+        except Exception as e:
+            self._set('failed', f"Model warm-up failed: {e}")
+        finally:
+            self.checked.set()
+            self.done.set()
+
+    @property
+    def failed(self):
+        return self.state in self.FAILED
+
+    def wait(self, timeout=None, ready=False):
+        """Block until the backend has answered (or, with ready=True, warm-up ends); returns report()."""
+        (self.done if ready else self.checked).wait(timeout)
+        return self.report()
+
+    def report(self):
+        with self.lock:
+            return {
+                'state': self.state,
+                'error': self.error,
+                'model': self.model,
+                'elapsed': time.perf_counter() - self.started if self.started else 0.0,
+                'times': dict(self.times),
+            }
+
+    def describe(self):
+        """One line for the menu."""
+        report = self.report()
+        state = report['state']
+        if self.failed:
+            return report['error']
+        if state == 'ready':
+            return f"Model {report['model']} ready ({sum(report['times'].get(k, 0) for k in ('load', 'prime')):.1f}s to warm up)"
+        if state in ('loading', 'priming'):
+            return f"Loading model {report['model']}..."
+        return "Connecting to the model server..."